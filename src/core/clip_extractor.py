@@ -2,12 +2,237 @@
 Clip Extractor - Extract video clips using FFmpeg based on segments
 """
 import os
+import json
+import asyncio
 import subprocess
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Software codec -> NVENC hardware encoder equivalent
+NVENC_ENCODERS = {
+    'libx264': 'h264_nvenc',
+    'libx265': 'hevc_nvenc',
+}
+
+# Keep FFmpeg's stderr down to actual errors so it can be piped and logged cheaply
+FFMPEG_LOG_ARGS = ['-hide_banner', '-loglevel', 'error', '-nostats']
+
+
+@lru_cache(maxsize=None)
+def probe_hw_encoder(encoder):
+    """
+    Check whether a hardware encoder is usable on this machine
+    
+    `ffmpeg -encoders` only lists what the binary was compiled with, so a
+    one-frame test encode is run as well to confirm a GPU is present.
+    The result is cached for the lifetime of the process.
+    
+    Args:
+        encoder: FFmpeg encoder name (e.g., h264_nvenc)
+        
+    Returns:
+        True if the encoder can be used, False otherwise
+    """
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-encoders'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=True
+        )
+        if encoder not in result.stdout.decode(errors='replace'):
+            return False
+        
+        test = subprocess.run(
+            [
+                'ffmpeg', '-hide_banner', '-loglevel', 'error',
+                '-f', 'lavfi', '-i', 'color=c=black:s=256x256:d=0.1',
+                '-frames:v', '1',
+                '-c:v', encoder,
+                '-f', 'null', '-'
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        return test.returncode == 0
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+
+@lru_cache(maxsize=None)
+def _ffmpeg_lists(kind, name):
+    """
+    Check whether FFmpeg was built with a given filter or encoder (cached)
+    
+    Args:
+        kind: FFmpeg listing to search, 'filters' or 'encoders'
+        name: Filter or encoder name (e.g., scale_cuda, libsvtav1)
+        
+    Returns:
+        True if FFmpeg lists the name, False otherwise
+    """
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', f'-{kind}'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=True
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+    
+    return any(
+        len(fields) > 1 and fields[1] == name
+        for fields in (line.split() for line in result.stdout.decode(errors='replace').splitlines())
+    )
+
+
+@lru_cache(maxsize=None)
+def _ffmpeg_version_check():
+    """
+    Run `ffmpeg -version` once per process
+    
+    Raises on failure; lru_cache does not cache exceptions, so a missing
+    FFmpeg is re-checked on the next call.
+    """
+    subprocess.run(['ffmpeg', '-version'],
+                   stdout=subprocess.PIPE,
+                   stderr=subprocess.PIPE,
+                   check=True)
+    return True
+
+
+def _parse_frame_rate(frame_rate):
+    """
+    Parse an FFprobe frame rate such as "30000/1001" into a float
+    
+    Args:
+        frame_rate: Frame rate string (fraction or plain number)
+        
+    Returns:
+        Frames per second, or 0.0 if the rate is undefined
+    """
+    num, _, den = frame_rate.partition('/')
+    if not den:
+        return float(num)
+    den = float(den)
+    return float(num) / den if den else 0.0
+
+
+def _read_video_info_pyav(video_path):
+    """
+    Read video information in-process with PyAV (optional dependency)
+    
+    Args:
+        video_path: Video file path
+        
+    Returns:
+        Dictionary with video information, or None if PyAV is not installed
+        or cannot read the file (the caller falls back to FFprobe)
+    """
+    try:
+        import av
+    except ImportError:
+        return None
+    
+    try:
+        with av.open(video_path) as container:
+            if not container.streams.video:
+                return {}
+            
+            stream = container.streams.video[0]
+            audio = container.streams.audio[0] if container.streams.audio else None
+            duration = container.duration / av.time_base if container.duration else 0.0
+            frame_rate = stream.average_rate
+            
+            return {
+                'duration': float(duration),
+                'width': int(stream.codec_context.width or 0),
+                'height': int(stream.codec_context.height or 0),
+                'codec': stream.codec_context.name or '',
+                'audio_codec': audio.codec_context.name if audio else None,
+                'fps': float(frame_rate) if frame_rate else 0.0
+            }
+    except Exception as e:
+        logger.debug(f"PyAV could not read {video_path}, falling back to FFprobe: {e}")
+        return None
+
+
+@lru_cache(maxsize=128)
+def _probe_video_info(video_path, mtime_ns, size):
+    """
+    Probe a video with FFprobe (cached per path, modification time and size)
+    
+    Args:
+        video_path: Video file path
+        mtime_ns: File modification time, part of the cache key
+        size: File size in bytes, part of the cache key
+        
+    Returns:
+        Dictionary with video information (empty if no video stream)
+    """
+    # Read the container header in-process when PyAV is installed
+    info = _read_video_info_pyav(video_path)
+    if info is not None:
+        return info
+    
+    cmd = [
+        'ffprobe',
+        '-v', 'quiet',
+        '-print_format', 'json',
+        '-show_format',
+        '-show_streams',
+        video_path
+    ]
+    
+    result = subprocess.run(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True
+    )
+    
+    info = json.loads(result.stdout.decode())
+    
+    # Extract useful information
+    video_stream = next((s for s in info['streams'] if s['codec_type'] == 'video'), None)
+    audio_stream = next((s for s in info['streams'] if s['codec_type'] == 'audio'), None)
+    
+    if video_stream:
+        return {
+            'duration': float(info['format'].get('duration', 0)),
+            'width': int(video_stream.get('width', 0)),
+            'height': int(video_stream.get('height', 0)),
+            'codec': video_stream.get('codec_name', ''),
+            'audio_codec': audio_stream.get('codec_name', '') if audio_stream else None,
+            'fps': _parse_frame_rate(video_stream.get('r_frame_rate', '0/1'))
+        }
+    
+    return {}
+
+
+async def run_ffmpeg_async(cmd):
+    """
+    Run an FFmpeg command without blocking the event loop
+    
+    Args:
+        cmd: List of command arguments
+        
+    Returns:
+        Tuple of (returncode, stderr bytes)
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    _, stderr = await proc.communicate()
+    return proc.returncode, stderr
+
 
 class ClipExtractor:
     """Extract video clips using FFmpeg"""
@@ -26,20 +251,96 @@ class ClipExtractor:
         self.audio_bitrate = config.get('audio_bitrate', '128k')
         self.video_codec = config.get('video_codec', 'libx264')
         self.audio_codec = config.get('audio_codec', 'aac')
+        self.hardware_encoding = config.get('hardware_encoding', True)
+        self._max_parallel_clips = config.get('max_parallel_clips') or os.cpu_count() or 1
+        self.max_parallel_hw_encodes = config.get('max_parallel_hw_encodes', 3)
+        self.frame_accurate_cuts = config.get('frame_accurate_cuts', False)
+        self.intermediate_preset = config.get('intermediate_preset', 'ultrafast')
+        
+        # Detected hardware encoder (populated by _detect_hw_encoder)
+        self._hw_encoder = None
+        self._hw_encoder_checked = False
+    
+    @property
+    def max_parallel_clips(self):
+        """
+        Number of FFmpeg encodes to run at once
+        
+        Consumer NVIDIA cards only allow a few concurrent NVENC sessions, so
+        the limit drops to max_parallel_hw_encodes when NVENC is in use.
+        """
+        if self.max_parallel_hw_encodes and self._detect_hw_encoder():
+            return min(self._max_parallel_clips, self.max_parallel_hw_encodes)
+        return self._max_parallel_clips
     
     def _check_ffmpeg(self):
         """Check if FFmpeg is installed"""
         try:
-            subprocess.run(['ffmpeg', '-version'], 
-                         stdout=subprocess.PIPE, 
-                         stderr=subprocess.PIPE,
-                         check=True)
+            _ffmpeg_version_check()
+            self._detect_hw_encoder()
             return True
         except (subprocess.CalledProcessError, FileNotFoundError):
             logger.error("FFmpeg not found. Please install FFmpeg.")
             return False
     
-    def _build_ffmpeg_command(self, input_path, output_path, start_time, duration, filters=None):
+    def _detect_hw_encoder(self):
+        """
+        Detect an NVENC hardware encoder matching the configured codec
+        
+        Returns:
+            Encoder name (h264_nvenc, hevc_nvenc) or None if unavailable
+        """
+        if self._hw_encoder_checked:
+            return self._hw_encoder
+        
+        self._hw_encoder_checked = True
+        
+        if self.video_codec in NVENC_ENCODERS.values():
+            # Explicitly requested in config
+            self._hw_encoder = self.video_codec
+        elif self.hardware_encoding and self.video_codec in NVENC_ENCODERS:
+            encoder = NVENC_ENCODERS[self.video_codec]
+            if probe_hw_encoder(encoder):
+                logger.info(f"Hardware encoder available, using {encoder}")
+                self._hw_encoder = encoder
+        
+        return self._hw_encoder
+    
+    def get_video_codec_args(self, preset=None, intermediate=False):
+        """
+        Build video codec arguments, preferring NVENC when available
+        
+        Args:
+            preset: Optional x264/x265 preset (ignored for NVENC)
+            intermediate: Use the fastest preset, for outputs that will be
+                re-encoded again later (overrides preset)
+            
+        Returns:
+            List of FFmpeg codec arguments
+        """
+        hw_encoder = self._detect_hw_encoder()
+        
+        if hw_encoder:
+            # NVENC has no CRF; constant-quality VBR is the closest equivalent
+            return [
+                '-c:v', hw_encoder,
+                '-preset', 'p1' if intermediate else 'p4',
+                '-tune', 'hq',
+                '-rc', 'vbr',
+                '-cq', str(self.quality_crf),
+                '-b:v', '0',
+            ]
+        
+        if intermediate:
+            preset = self.intermediate_preset
+        
+        args = ['-c:v', self.video_codec, '-crf', str(self.quality_crf)]
+        if preset:
+            args.extend(['-preset', preset])
+        return args
+    
+    def _build_ffmpeg_command(self, input_path, output_path, start_time, duration, filters=None,
+                              threads=None, frame_accurate=None):
         """
         Build FFmpeg command
         
@@ -49,20 +350,50 @@ class ClipExtractor:
             start_time: Start time in seconds
             duration: Duration in seconds
             filters: Optional video filters
+            threads: Optional FFmpeg thread count (used when running in parallel)
+            frame_accurate: Re-encode for frame-accurate cuts (defaults to config)
             
         Returns:
             List of command arguments
         """
+        if frame_accurate is None:
+            frame_accurate = self.frame_accurate_cuts
+        
+        # Plain trims don't need a re-encode: remux the packets instead.
+        # The cut snaps to the nearest keyframe before start_time.
+        if not filters and not frame_accurate:
+            return [
+                'ffmpeg',
+                *FFMPEG_LOG_ARGS,
+                '-ss', str(start_time),
+                '-i', input_path,
+                '-t', str(duration),
+                '-c', 'copy',
+                '-avoid_negative_ts', 'make_zero',
+                '-movflags', '+faststart',
+                '-y', output_path
+            ]
+        
+        # -ss before -i seeks the input via its index instead of decoding
+        # everything up to start_time. When re-encoding, FFmpeg still trims
+        # the decoded frames to the exact timestamp, so the cut stays accurate.
         cmd = [
             'ffmpeg',
-            '-i', input_path,
+            *FFMPEG_LOG_ARGS,
             '-ss', str(start_time),
+            '-i', input_path,
+        ]
+        
+        # Cap per-process threads so parallel encodes don't oversubscribe the CPU
+        if threads:
+            cmd.extend(['-threads', str(threads)])
+        
+        cmd.extend([
             '-t', str(duration),
-            '-c:v', self.video_codec,
-            '-crf', str(self.quality_crf),
+            *self.get_video_codec_args(),
             '-c:a', self.audio_codec,
             '-b:a', self.audio_bitrate,
-        ]
+        ])
         
         # Add video filters if specified
         if filters:
@@ -73,9 +404,35 @@ class ClipExtractor:
         
         return cmd
     
-    def extract_clip(self, video_path, segment, output_dir, filename_prefix="clip"):
+    def threads_per_invocation(self, n_workers):
         """
-        Extract a single clip from video
+        Work out the FFmpeg thread count when running several encodes at once
+        
+        Each libx264 process otherwise starts its own pool of ~one thread per
+        core, so N parallel encodes end up with N times too many threads.
+        The RED_CLIPPING_FFMPEG_THREADS environment variable overrides this.
+        
+        Args:
+            n_workers: Number of FFmpeg processes running in parallel
+            
+        Returns:
+            Threads per FFmpeg process, or None to let FFmpeg decide
+        """
+        env_threads = os.getenv('RED_CLIPPING_FFMPEG_THREADS')
+        if env_threads:
+            try:
+                return max(1, int(env_threads))
+            except ValueError:
+                logger.warning(f"Ignoring invalid RED_CLIPPING_FFMPEG_THREADS value: {env_threads}")
+        
+        if n_workers <= 1:
+            return None
+        
+        return max(1, (os.cpu_count() or n_workers) // n_workers)
+    
+    def _plan_clip(self, video_path, segment, output_dir, filename_prefix):
+        """
+        Validate a segment and work out its trim window and output path
         
         Args:
             video_path: Source video path
@@ -84,11 +441,8 @@ class ClipExtractor:
             filename_prefix: Prefix for output filename
             
         Returns:
-            Path to extracted clip or None if failed
+            Tuple of (start_time, duration, output_path) or None if the segment is invalid
         """
-        if not self._check_ffmpeg():
-            raise RuntimeError("FFmpeg is required but not found")
-        
         # Calculate duration
         start_time = segment.get('start_time', 0)
         end_time = segment.get('end_time', 0)
@@ -111,12 +465,73 @@ class ClipExtractor:
         output_filename = f"{filename_prefix}_{video_name}_{int(start_time)}_{int(end_time)}.mp4"
         output_path = os.path.join(output_dir, output_filename)
         
+        return start_time, duration, output_path
+    
+    def _build_multi_output_command(self, video_path, planned_clips):
+        """
+        Build a single FFmpeg command that stream-copies several clips
+        
+        Each clip gets its own input-side seek into the same source, so the
+        whole batch costs one FFmpeg start-up instead of one per clip.
+        
+        Args:
+            video_path: Source video path
+            planned_clips: List of (start_time, duration, output_path) tuples
+            
+        Returns:
+            List of command arguments
+        """
+        cmd = ['ffmpeg', *FFMPEG_LOG_ARGS]
+        
+        for start_time, duration, _ in planned_clips:
+            cmd.extend(['-ss', str(start_time), '-t', str(duration), '-i', video_path])
+        
+        for i, (_, _, output_path) in enumerate(planned_clips):
+            cmd.extend([
+                '-map', f'{i}:v:0',
+                '-map', f'{i}:a:0?',
+                '-c', 'copy',
+                '-avoid_negative_ts', 'make_zero',
+                '-movflags', '+faststart',
+                '-y', output_path
+            ])
+        
+        return cmd
+    
+    def extract_clip(self, video_path, segment, output_dir, filename_prefix="clip", threads=None,
+                     frame_accurate=None):
+        """
+        Extract a single clip from video
+        
+        Args:
+            video_path: Source video path
+            segment: Segment dictionary with start_time and end_time
+            output_dir: Output directory
+            filename_prefix: Prefix for output filename
+            threads: Optional FFmpeg thread count
+            frame_accurate: Re-encode for frame-accurate cuts (defaults to config)
+            
+        Returns:
+            Path to extracted clip or None if failed
+        """
+        if not self._check_ffmpeg():
+            raise RuntimeError("FFmpeg is required but not found")
+        
+        planned = self._plan_clip(video_path, segment, output_dir, filename_prefix)
+        if planned is None:
+            return None
+        
+        start_time, duration, output_path = planned
+        end_time = segment.get('end_time', 0)
+        
         # Build FFmpeg command
         cmd = self._build_ffmpeg_command(
             video_path,
             output_path,
             start_time,
-            duration
+            duration,
+            threads=threads,
+            frame_accurate=frame_accurate
         )
         
         logger.info(f"Extracting clip: {start_time}s to {end_time}s from {video_path}")
@@ -125,7 +540,7 @@ class ClipExtractor:
             # Run FFmpeg
             result = subprocess.run(
                 cmd,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
                 check=True
             )
@@ -145,7 +560,62 @@ class ClipExtractor:
             logger.error(f"Clip extraction failed: {e}")
             return None
     
-    def extract_clips(self, video_path, segments, output_dir):
+    async def extract_clip_async(self, video_path, segment, output_dir, filename_prefix="clip",
+                                 threads=None, frame_accurate=None):
+        """
+        Extract a single clip from video without blocking the event loop
+        
+        Args:
+            video_path: Source video path
+            segment: Segment dictionary with start_time and end_time
+            output_dir: Output directory
+            filename_prefix: Prefix for output filename
+            threads: Optional FFmpeg thread count
+            frame_accurate: Re-encode for frame-accurate cuts (defaults to config)
+            
+        Returns:
+            Path to extracted clip or None if failed
+        """
+        if not self._check_ffmpeg():
+            raise RuntimeError("FFmpeg is required but not found")
+        
+        planned = self._plan_clip(video_path, segment, output_dir, filename_prefix)
+        if planned is None:
+            return None
+        
+        start_time, duration, output_path = planned
+        end_time = segment.get('end_time', 0)
+        
+        cmd = self._build_ffmpeg_command(
+            video_path,
+            output_path,
+            start_time,
+            duration,
+            threads=threads,
+            frame_accurate=frame_accurate
+        )
+        
+        logger.info(f"Extracting clip: {start_time}s to {end_time}s from {video_path}")
+        
+        try:
+            returncode, stderr = await run_ffmpeg_async(cmd)
+            
+            if returncode != 0:
+                logger.error(f"FFmpeg failed: {stderr.decode()}")
+                return None
+            
+            if os.path.exists(output_path):
+                logger.info(f"Clip extracted successfully: {output_path}")
+                return output_path
+            else:
+                logger.error("FFmpeg completed but output file not found")
+                return None
+        
+        except Exception as e:
+            logger.error(f"Clip extraction failed: {e}")
+            return None
+    
+    def extract_clips(self, video_path, segments, output_dir, max_threads=None):
         """
         Extract multiple clips from video
         
@@ -153,20 +623,52 @@ class ClipExtractor:
             video_path: Source video path
             segments: List of segment dictionaries
             output_dir: Output directory
+            max_threads: Optional cap on threads per FFmpeg process (set when
+                other videos are being processed at the same time)
             
         Returns:
             List of extracted clip paths
         """
         clips = []
         
-        for i, segment in enumerate(segments):
-            clip_path = self.extract_clip(
+        if not segments:
+            return clips
+        
+        # Trim-only clips can all come out of one FFmpeg invocation
+        if not self.frame_accurate_cuts:
+            clips = self._extract_clips_single_pass(video_path, segments, output_dir)
+            if clips is not None:
+                logger.info(f"Extracted {len(clips)} clips from {video_path}")
+                return clips
+            
+            logger.warning("Single-pass extraction failed, extracting clips individually")
+            clips = []
+        
+        # Clips are independent FFmpeg processes, so run them side by side.
+        # Threads are enough here: the work happens in the child processes.
+        # This path always re-encodes: either frame-accurate cuts are on, or
+        # stream copy just failed (e.g. codecs that can't be muxed into .mp4).
+        workers = min(self.max_parallel_clips, len(segments))
+        threads = self.threads_per_invocation(workers)
+        if max_threads:
+            threads = min(threads or max_threads, max_threads)
+        
+        def extract(indexed_segment):
+            i, segment = indexed_segment
+            return self.extract_clip(
                 video_path,
                 segment,
                 output_dir,
-                filename_prefix=f"clip_{i+1:02d}"
+                filename_prefix=f"clip_{i+1:02d}",
+                threads=threads,
+                frame_accurate=True
             )
-            
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map() preserves segment order
+            clip_paths = list(executor.map(extract, enumerate(segments)))
+        
+        for segment, clip_path in zip(segments, clip_paths):
             if clip_path:
                 clips.append({
                     'path': clip_path,
@@ -176,7 +678,54 @@ class ClipExtractor:
         logger.info(f"Extracted {len(clips)} clips from {video_path}")
         return clips
     
-    def apply_filters(self, video_path, output_path, filters):
+    def _extract_clips_single_pass(self, video_path, segments, output_dir):
+        """
+        Stream-copy all segments with one FFmpeg process
+        
+        Args:
+            video_path: Source video path
+            segments: List of segment dictionaries
+            output_dir: Output directory
+            
+        Returns:
+            List of clip dictionaries, or None if FFmpeg failed
+        """
+        if not self._check_ffmpeg():
+            raise RuntimeError("FFmpeg is required but not found")
+        
+        planned = []
+        for i, segment in enumerate(segments):
+            planned_clip = self._plan_clip(video_path, segment, output_dir, f"clip_{i+1:02d}")
+            if planned_clip:
+                planned.append((segment, planned_clip))
+        
+        if not planned:
+            return []
+        
+        cmd = self._build_multi_output_command(video_path, [p for _, p in planned])
+        
+        logger.info(f"Extracting {len(planned)} clips in one pass from {video_path}")
+        
+        try:
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg failed: {e.stderr.decode()}")
+            return None
+        
+        clips = []
+        for segment, (_, _, output_path) in planned:
+            if os.path.exists(output_path):
+                logger.info(f"Clip extracted successfully: {output_path}")
+                clips.append({
+                    'path': output_path,
+                    'segment': segment
+                })
+            else:
+                logger.error(f"FFmpeg completed but output file not found: {output_path}")
+        
+        return clips
+    
+    def apply_filters(self, video_path, output_path, filters, final=False):
         """
         Apply video filters to a clip
         
@@ -184,6 +733,8 @@ class ClipExtractor:
             video_path: Input video path
             output_path: Output video path
             filters: FFmpeg filter string
+            final: True if the output is published as-is; otherwise it is
+                treated as an intermediate and encoded with the fastest preset
             
         Returns:
             True if successful, False otherwise
@@ -193,10 +744,10 @@ class ClipExtractor:
         
         cmd = [
             'ffmpeg',
+            *FFMPEG_LOG_ARGS,
             '-i', video_path,
             '-vf', filters,
-            '-c:v', self.video_codec,
-            '-crf', str(self.quality_crf),
+            *self.get_video_codec_args(intermediate=not final),
             '-c:a', 'copy',  # Copy audio without re-encoding
             '-y', output_path
         ]
@@ -204,7 +755,7 @@ class ClipExtractor:
         logger.info(f"Applying filters to {video_path}")
         
         try:
-            subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
             
             if os.path.exists(output_path):
                 logger.info(f"Filters applied successfully: {output_path}")
@@ -219,7 +770,10 @@ class ClipExtractor:
     
     def get_video_info(self, video_path):
         """
-        Get video information using FFprobe
+        Get video information using PyAV if installed, otherwise FFprobe
+        
+        Results are cached per (path, mtime, size), so probing the same
+        unchanged file again does not spawn another ffprobe.
         
         Args:
             video_path: Video file path
@@ -227,39 +781,11 @@ class ClipExtractor:
         Returns:
             Dictionary with video information
         """
-        cmd = [
-            'ffprobe',
-            '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_format',
-            '-show_streams',
-            video_path
-        ]
-        
         try:
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                check=True
-            )
-            
-            import json
-            info = json.loads(result.stdout.decode())
-            
-            # Extract useful information
-            video_stream = next((s for s in info['streams'] if s['codec_type'] == 'video'), None)
-            
-            if video_stream:
-                return {
-                    'duration': float(info['format'].get('duration', 0)),
-                    'width': int(video_stream.get('width', 0)),
-                    'height': int(video_stream.get('height', 0)),
-                    'codec': video_stream.get('codec_name', ''),
-                    'fps': eval(video_stream.get('r_frame_rate', '0/1'))
-                }
-            
-            return {}
+            stat = os.stat(video_path)
+            info = _probe_video_info(video_path, stat.st_mtime_ns, stat.st_size)
+            # Hand out a copy so callers can't modify the cached entry
+            return dict(info)
         
         except Exception as e:
             logger.error(f"Failed to get video info: {e}")
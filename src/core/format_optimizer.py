@@ -2,12 +2,53 @@
 Format Optimizer - Optimize video format for different platforms
 """
 import os
+import shutil
+import asyncio
 import subprocess
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
 from pathlib import Path
 
+from .clip_extractor import ClipExtractor, FFMPEG_LOG_ARGS, _ffmpeg_lists, run_ffmpeg_async
+
 logger = logging.getLogger(__name__)
 
+# Watermark overlay positions (10px margin)
+WATERMARK_POSITIONS = {
+    'top_left': '10:10',
+    'top_right': 'W-w-10:10',
+    'bottom_left': '10:H-h-10',
+    'bottom_right': 'W-w-10:H-h-10'
+}
+
+# Encoder -> codec name ffprobe reports for its output
+ENCODER_CODECS = {
+    'libx264': 'h264',
+    'h264_nvenc': 'h264',
+    'libx265': 'hevc',
+    'hevc_nvenc': 'hevc',
+    'libsvtav1': 'av1',
+}
+
+# SVT-AV1's CRF scale runs 1-63; its CRF 35 looks about like x264 CRF 23,
+# so quality_crf is shifted by this much for platforms with `codec: av1`
+AV1_CRF_OFFSET = 12
+
+# Output arguments of a remux (stream copy) command
+REMUX_ARGS = ['-c', 'copy']
+
+
+def _av1_codec_args(quality_crf):
+    """SVT-AV1 arguments (fast preset) matching the quality of an x264 CRF"""
+    crf = min(max(quality_crf + AV1_CRF_OFFSET, 1), 63)
+    return ['-c:v', 'libsvtav1', '-preset', '8', '-crf', str(crf), '-svtav1-params', 'tune=0']
+
+
+def _is_remux(args):
+    """Whether FFmpeg arguments stream-copy instead of encoding"""
+    return any(args[i:i + 2] == REMUX_ARGS for i in range(len(args) - 1))
+
 
 class FormatOptimizer:
     """Optimize video format for platform-specific requirements"""
@@ -26,6 +67,10 @@ class FormatOptimizer:
         self.video_codec = config.get('video_codec', 'libx264')
         self.audio_codec = config.get('audio_codec', 'aac')
         self.quality_crf = config.get('quality_crf', 23)
+        
+        # Shared extractor for probing and codec selection (its ffprobe and
+        # hardware-encoder results are cached across calls)
+        self._extractor = ClipExtractor(config)
     
     def _parse_aspect_ratio(self, aspect_ratio):
         """Parse aspect ratio string to width:height ratio"""
@@ -79,17 +124,48 @@ class FormatOptimizer:
         
         return new_width, new_height, crop_params
     
-    def optimize_for_platform(self, video_path, platform, output_dir=None):
+    def _build_optimize_command(self, video_path, platform, output_dir=None, watermark_path=None,
+                                watermark_position="bottom_right", threads=None, allow_remux=True):
         """
-        Optimize video for specific platform
+        Build the FFmpeg command that optimizes a video for a platform
         
         Args:
             video_path: Input video path
             platform: Platform name (instagram, youtube, tiktok)
             output_dir: Optional output directory
+            watermark_path: Optional watermark image overlaid in the same encode
+            watermark_position: Watermark position (top_left, top_right, bottom_left, bottom_right)
+            threads: Optional encoder thread count (set when several encodes run at once)
+            allow_remux: Stream-copy sources that already meet the requirements
             
         Returns:
-            Path to optimized video or None if failed
+            Tuple of (cmd, output_path, max_file_size_mb) or None if failed
+        """
+        args = self._build_optimize_args(
+            video_path, platform, output_dir, watermark_path, watermark_position, threads, allow_remux
+        )
+        if args is None:
+            return None
+        
+        input_args, output_args, output_path, max_file_size_mb = args
+        return ['ffmpeg', *FFMPEG_LOG_ARGS, *input_args, *output_args], output_path, max_file_size_mb
+    
+    def _build_optimize_args(self, video_path, platform, output_dir=None, watermark_path=None,
+                             watermark_position="bottom_right", threads=None, allow_remux=True):
+        """
+        Build the input and output FFmpeg arguments that optimize a video for a platform
+        
+        Args:
+            video_path: Input video path
+            platform: Platform name (instagram, youtube, tiktok)
+            output_dir: Optional output directory
+            watermark_path: Optional watermark image overlaid in the same encode
+            watermark_position: Watermark position (top_left, top_right, bottom_left, bottom_right)
+            threads: Optional encoder thread count (set when several encodes run at once)
+            allow_remux: Stream-copy sources that already meet the requirements
+            
+        Returns:
+            Tuple of (input_args, output_args, output_path, max_file_size_mb) or None if failed
         """
         if platform not in self.platform_settings:
             logger.error(f"Unknown platform: {platform}")
@@ -98,9 +174,7 @@ class FormatOptimizer:
         platform_config = self.platform_settings[platform]
         
         # Get video info
-        from .clip_extractor import ClipExtractor
-        extractor = ClipExtractor(self.config)
-        video_info = extractor.get_video_info(video_path)
+        video_info = self._extractor.get_video_info(video_path)
         
         if not video_info:
             logger.error(f"Failed to get video info for {video_path}")
@@ -111,6 +185,13 @@ class FormatOptimizer:
         target_aspect = platform_config.get('aspect_ratio', self.target_aspect_ratio)
         max_file_size_mb = platform_config.get('max_file_size_mb', 100)
         
+        # AV1 is opt-in per platform and needs an FFmpeg built with SVT-AV1
+        use_av1 = platform_config.get('codec', 'h264') == 'av1'
+        if use_av1 and not _ffmpeg_lists('encoders', 'libsvtav1'):
+            logger.warning(f"libsvtav1 is not available, encoding {platform} output as H.264")
+            use_av1 = False
+        target_encoder = 'libsvtav1' if use_av1 else self._extractor.video_codec
+        
         current_width = video_info.get('width', 0)
         current_height = video_info.get('height', 0)
         current_duration = video_info.get('duration', 0)
@@ -130,31 +211,96 @@ class FormatOptimizer:
         output_filename = f"{video_name}_{platform}_optimized.mp4"
         output_path = os.path.join(output_dir, output_filename)
         
-        # Build FFmpeg command
-        cmd = ['ffmpeg', '-i', video_path]
+        # Nothing to change: the source already has the target size, codecs,
+        # length and file size, so remux it instead of re-encoding. Audio
+        # must already be AAC (or absent) to be copied into the MP4 as-is.
+        if (
+            allow_remux
+            and not crop_params
+            and not watermark_path
+            and (target_aspect != "9:16" or (new_width, new_height) == (1080, 1920))
+            and current_duration <= max_duration
+            and os.path.getsize(video_path) <= max_file_size_mb * 1024 * 1024
+            and video_info.get('codec') == ENCODER_CODECS.get(target_encoder)
+            and video_info.get('audio_codec') in ('aac', None)
+        ):
+            logger.info(f"{video_path} already meets {platform} requirements, remuxing without re-encode")
+            input_args = ['-i', video_path]
+            output_args = [
+                *REMUX_ARGS,
+                '-avoid_negative_ts', 'make_zero',
+                '-movflags', '+faststart',
+                '-y', output_path
+            ]
+            return input_args, output_args, output_path, max_file_size_mb
+        
+        # Keep frames in GPU memory from decode through encode when possible.
+        # crop has no CUDA implementation, so cropped outputs decode on the
+        # GPU but filter on the CPU before going back to NVENC (as do
+        # watermarked outputs, which need the CPU overlay filter, and AV1
+        # outputs, which use a software encoder).
+        hw_encoder = self._extractor._detect_hw_encoder()
+        gpu_resident = (
+            bool(hw_encoder)
+            and not use_av1
+            and not crop_params
+            and not watermark_path
+            and _ffmpeg_lists('filters', 'scale_cuda')
+        )
+        
+        # Build FFmpeg arguments
+        input_args = []
+        if gpu_resident:
+            input_args.extend(['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda'])
+        elif hw_encoder:
+            input_args.extend(['-hwaccel', 'cuda'])
+        input_args.extend(['-i', video_path])
+        if watermark_path:
+            input_args.extend(['-i', watermark_path])
         
-        # Add filters
+        output_args = []
+        
+        # Add filters. Crop comes first: it only moves frame pointers, so
+        # the scaler then works on the smaller cropped frame.
         filters = []
         
         # Crop to target aspect ratio if needed
         if crop_params:
             filters.append(f"crop={crop_params}")
         
-        # Scale to standard resolution (1080x1920 for 9:16)
+        # Scale to standard resolution (1080x1920 for 9:16), unless the
+        # (cropped) frame is already that size
         if target_aspect == "9:16":
             target_width = 1080
             target_height = 1920
-            filters.append(f"scale={target_width}:{target_height}")
-        
-        # Apply filters
-        if filters:
-            cmd.extend(['-vf', ','.join(filters)])
+            if (new_width, new_height) != (target_width, target_height):
+                scale_filter = 'scale_cuda' if gpu_resident else 'scale'
+                filters.append(f"{scale_filter}={target_width}:{target_height}")
+        
+        # Apply filters. A watermark is overlaid in the same filter graph so
+        # the clip is only encoded once.
+        if watermark_path:
+            overlay_pos = WATERMARK_POSITIONS.get(watermark_position, WATERMARK_POSITIONS['bottom_right'])
+            base = f"[0:v]{','.join(filters)}[base];[base]" if filters else "[0:v]"
+            output_args.extend([
+                '-filter_complex', f"{base}[1:v]overlay={overlay_pos}[v]",
+                '-map', '[v]',
+                '-map', '0:a?',
+            ])
+        elif filters:
+            output_args.extend(['-vf', ','.join(filters)])
+        
+        # Codec settings (SVT-AV1 for AV1 platforms, otherwise NVENC when
+        # available, otherwise the configured software encoder)
+        if use_av1:
+            output_args.extend(_av1_codec_args(platform_config.get('quality_crf', self.quality_crf)))
+        else:
+            output_args.extend(self._extractor.get_video_codec_args(preset='medium'))
         
-        # Codec settings
-        cmd.extend([
-            '-c:v', self.video_codec,
-            '-crf', str(self.quality_crf),
-            '-preset', 'medium',
+        # Cap encoder threads so parallel encodes don't oversubscribe the CPU
+        if threads:
+            output_args.extend(['-threads', str(threads)])
+        output_args.extend([
             '-c:a', self.audio_codec,
             '-b:a', '128k',
             '-movflags', '+faststart',  # Enable progressive download
@@ -162,43 +308,210 @@ class FormatOptimizer:
         
         # Limit duration if needed
         if current_duration > max_duration:
-            cmd.extend(['-t', str(max_duration)])
+            output_args.extend(['-t', str(max_duration)])
         
         # Output file
-        cmd.extend(['-y', output_path])
+        output_args.extend(['-y', output_path])
+        
+        return input_args, output_args, output_path, max_file_size_mb
+    
+    def _check_optimized_output(self, output_path, platform, max_file_size_mb):
+        """
+        Verify an optimized output exists and report its size
+        
+        Returns:
+            Path to optimized video or None if missing
+        """
+        if not os.path.exists(output_path):
+            logger.error("Optimization completed but output file not found")
+            return None
+        
+        # Check file size
+        file_size_mb = os.path.getsize(output_path) / (1024 * 1024)
+        
+        if file_size_mb > max_file_size_mb:
+            logger.warning(f"Output file size ({file_size_mb:.2f}MB) exceeds limit ({max_file_size_mb}MB)")
+            # Could implement re-encoding with lower quality here
+        
+        logger.info(f"Video optimized for {platform}: {output_path} ({file_size_mb:.2f}MB)")
+        return output_path
+    
+    def optimize_for_platform(self, video_path, platform, output_dir=None, watermark_path=None,
+                              watermark_position="bottom_right", threads=None, allow_remux=True):
+        """
+        Optimize video for specific platform
+        
+        Args:
+            video_path: Input video path
+            platform: Platform name (instagram, youtube, tiktok)
+            output_dir: Optional output directory
+            watermark_path: Optional watermark image overlaid in the same encode
+            watermark_position: Watermark position (top_left, top_right, bottom_left, bottom_right)
+            threads: Optional encoder thread count (set when several encodes run at once)
+            allow_remux: Stream-copy sources that already meet the requirements
+            
+        Returns:
+            Path to optimized video or None if failed
+        """
+        command = self._build_optimize_command(
+            video_path, platform, output_dir, watermark_path, watermark_position, threads, allow_remux
+        )
+        if command is None:
+            return None
+        
+        cmd, output_path, max_file_size_mb = command
         
         logger.info(f"Optimizing video for {platform}: {video_path}")
         
         try:
-            result = subprocess.run(
+            subprocess.run(
                 cmd,
-                stdout=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
                 check=True
             )
             
-            if os.path.exists(output_path):
-                # Check file size
-                file_size_mb = os.path.getsize(output_path) / (1024 * 1024)
-                
-                if file_size_mb > max_file_size_mb:
-                    logger.warning(f"Output file size ({file_size_mb:.2f}MB) exceeds limit ({max_file_size_mb}MB)")
-                    # Could implement re-encoding with lower quality here
-                
-                logger.info(f"Video optimized for {platform}: {output_path} ({file_size_mb:.2f}MB)")
-                return output_path
-            else:
-                logger.error("Optimization completed but output file not found")
-                return None
+            return self._check_optimized_output(output_path, platform, max_file_size_mb)
         
         except subprocess.CalledProcessError as e:
+            if _is_remux(cmd):
+                logger.warning(f"Remux for {platform} failed, re-encoding instead: {e.stderr.decode()}")
+                return self.optimize_for_platform(
+                    video_path, platform, output_dir, watermark_path, watermark_position, threads,
+                    allow_remux=False
+                )
             logger.error(f"Video optimization failed: {e.stderr.decode()}")
             return None
         except Exception as e:
             logger.error(f"Optimization error: {e}")
             return None
     
-    def batch_optimize(self, video_paths, platforms, output_dir):
+    async def optimize_for_platform_async(self, video_path, platform, output_dir=None, watermark_path=None,
+                                          watermark_position="bottom_right", threads=None,
+                                          allow_remux=True):
+        """
+        Optimize video for specific platform without blocking the event loop
+        
+        Args:
+            video_path: Input video path
+            platform: Platform name (instagram, youtube, tiktok)
+            output_dir: Optional output directory
+            watermark_path: Optional watermark image overlaid in the same encode
+            watermark_position: Watermark position (top_left, top_right, bottom_left, bottom_right)
+            threads: Optional encoder thread count (set when several encodes run at once)
+            allow_remux: Stream-copy sources that already meet the requirements
+            
+        Returns:
+            Path to optimized video or None if failed
+        """
+        command = self._build_optimize_command(
+            video_path, platform, output_dir, watermark_path, watermark_position, threads, allow_remux
+        )
+        if command is None:
+            return None
+        
+        cmd, output_path, max_file_size_mb = command
+        
+        logger.info(f"Optimizing video for {platform}: {video_path}")
+        
+        try:
+            returncode, stderr = await run_ffmpeg_async(cmd)
+            
+            if returncode != 0:
+                if _is_remux(cmd):
+                    logger.warning(f"Remux for {platform} failed, re-encoding instead: {stderr.decode()}")
+                    return await self.optimize_for_platform_async(
+                        video_path, platform, output_dir, watermark_path, watermark_position, threads,
+                        allow_remux=False
+                    )
+                logger.error(f"Video optimization failed: {stderr.decode()}")
+                return None
+            
+            return self._check_optimized_output(output_path, platform, max_file_size_mb)
+        
+        except Exception as e:
+            logger.error(f"Optimization error: {e}")
+            return None
+    
+    def optimize_for_platforms(self, video_path, platforms, output_dir=None, threads=None):
+        """
+        Optimize a video for several platforms with one FFmpeg process
+        
+        Outputs whose input options match (normally all of them) share a
+        single command with one output per platform, so the source is decoded
+        once instead of once per platform. Platforms whose output settings are
+        identical are encoded once and the file copied. If a shared command
+        fails, its platforms are retried one at a time so one bad output can't
+        sink the rest.
+        
+        Args:
+            video_path: Input video path
+            platforms: List of platform names
+            output_dir: Optional output directory
+            threads: Optional encoder thread count (set when several encodes run at once)
+            
+        Returns:
+            Dictionary mapping each platform to its optimized path (or None if failed)
+        """
+        results = {}
+        groups = {}
+        for platform in platforms:
+            args = self._build_optimize_args(video_path, platform, output_dir, threads=threads)
+            if args is None:
+                results[platform] = None
+                continue
+            input_args, output_args, output_path, max_file_size_mb = args
+            groups.setdefault(tuple(input_args), []).append(
+                (platform, output_args, output_path, max_file_size_mb)
+            )
+        
+        for input_args, outputs in groups.items():
+            # Identical output settings (everything but the file name) need
+            # only one encode; the other platforms get a copy
+            encodes = {}
+            for output in outputs:
+                encodes.setdefault(tuple(output[1][:-1]), []).append(output)
+            
+            if len(outputs) == 1:
+                platform = outputs[0][0]
+                results[platform] = self.optimize_for_platform(video_path, platform, output_dir, threads=threads)
+                continue
+            
+            cmd = ['ffmpeg', *FFMPEG_LOG_ARGS, *input_args]
+            for same_outputs in encodes.values():
+                cmd.extend(same_outputs[0][1])
+            
+            names = ', '.join(platform for platform, _, _, _ in outputs)
+            logger.info(f"Optimizing video for {names} in one pass: {video_path}")
+            
+            try:
+                subprocess.run(
+                    cmd,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    check=True
+                )
+            except subprocess.CalledProcessError as e:
+                logger.warning(f"Combined optimization failed, retrying per platform: {e.stderr.decode()}")
+                for platform, _, _, _ in outputs:
+                    results[platform] = self.optimize_for_platform(video_path, platform, output_dir, threads=threads)
+                continue
+            except Exception as e:
+                logger.error(f"Optimization error: {e}")
+                for platform, _, _, _ in outputs:
+                    results[platform] = None
+                continue
+            
+            for same_outputs in encodes.values():
+                encoded_path = same_outputs[0][2]
+                for platform, _, output_path, max_file_size_mb in same_outputs:
+                    if output_path != encoded_path and os.path.exists(encoded_path):
+                        shutil.copyfile(encoded_path, output_path)
+                    results[platform] = self._check_optimized_output(output_path, platform, max_file_size_mb)
+        
+        return results
+    
+    def batch_optimize(self, video_paths, platforms, output_dir, max_concurrent=None):
         """
         Optimize multiple videos for multiple platforms
         
@@ -206,24 +519,61 @@ class FormatOptimizer:
             video_paths: List of video paths
             platforms: List of platform names
             output_dir: Output directory
+            max_concurrent: Maximum simultaneous FFmpeg processes
+                (defaults to max_parallel_clips)
             
         Returns:
             Dictionary mapping video paths to platform-optimized paths
         """
-        results = {}
+        results = {video_path: {} for video_path in video_paths}
+        jobs = list(product(video_paths, platforms))
+        
+        if not jobs:
+            return results
+        
+        # Each job just waits on an FFmpeg child, so threads are enough; the
+        # pool size caps concurrent encodes (and NVENC sessions)
+        workers = min(max_concurrent or self._extractor.max_parallel_clips, len(jobs))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            optimized_paths = list(executor.map(
+                lambda job: self.optimize_for_platform(job[0], job[1], output_dir),
+                jobs
+            ))
+        
+        for (video_path, platform), optimized_path in zip(jobs, optimized_paths):
+            if optimized_path:
+                results[video_path][platform] = optimized_path
+        
+        return results
+    
+    async def batch_optimize_async(self, video_paths, platforms, output_dir, max_concurrent=None):
+        """
+        Optimize multiple videos for multiple platforms concurrently
         
-        for video_path in video_paths:
-            results[video_path] = {}
+        Args:
+            video_paths: List of video paths
+            platforms: List of platform names
+            output_dir: Output directory
+            max_concurrent: Maximum simultaneous FFmpeg processes
+                (defaults to max_parallel_clips)
             
-            for platform in platforms:
-                optimized_path = self.optimize_for_platform(
-                    video_path,
-                    platform,
-                    output_dir
-                )
-                
-                if optimized_path:
-                    results[video_path][platform] = optimized_path
+        Returns:
+            Dictionary mapping video paths to platform-optimized paths
+        """
+        semaphore = asyncio.Semaphore(max_concurrent or self._extractor.max_parallel_clips)
+        jobs = list(product(video_paths, platforms))
+        
+        async def optimize(video_path, platform):
+            async with semaphore:
+                return await self.optimize_for_platform_async(video_path, platform, output_dir)
+        
+        optimized_paths = await asyncio.gather(*[optimize(v, p) for v, p in jobs])
+        
+        results = {video_path: {} for video_path in video_paths}
+        for (video_path, platform), optimized_path in zip(jobs, optimized_paths):
+            if optimized_path:
+                results[video_path][platform] = optimized_path
         
         return results
     
@@ -231,6 +581,9 @@ class FormatOptimizer:
         """
         Add watermark to video
         
+        When the video is also being optimized for a platform, pass
+        watermark_path to optimize_for_platform instead to avoid a second encode.
+        
         Args:
             video_path: Input video path
             watermark_path: Watermark image path
@@ -240,21 +593,15 @@ class FormatOptimizer:
         Returns:
             True if successful, False otherwise
         """
-        # Position mappings
-        positions = {
-            'top_left': '10:10',
-            'top_right': 'W-w-10:10',
-            'bottom_left': '10:H-h-10',
-            'bottom_right': 'W-w-10:H-h-10'
-        }
-        
-        overlay_pos = positions.get(position, positions['bottom_right'])
+        overlay_pos = WATERMARK_POSITIONS.get(position, WATERMARK_POSITIONS['bottom_right'])
         
         cmd = [
             'ffmpeg',
+            *FFMPEG_LOG_ARGS,
             '-i', video_path,
             '-i', watermark_path,
             '-filter_complex', f"overlay={overlay_pos}",
+            *self._extractor.get_video_codec_args(preset='medium'),
             '-codec:a', 'copy',
             '-y', output_path
         ]
@@ -262,7 +609,7 @@ class FormatOptimizer:
         logger.info(f"Adding watermark to {video_path}")
         
         try:
-            subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
             
             if os.path.exists(output_path):
                 logger.info(f"Watermark added: {output_path}")
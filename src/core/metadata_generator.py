@@ -4,6 +4,8 @@ Metadata Generator - Generate captions and hashtags using AI
 import os
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import yaml
 
 logger = logging.getLogger(__name__)
@@ -32,12 +34,33 @@ class MetadataGenerator:
         }
         self.default_hashtags = config.get('default_hashtags', [])
         
+        # Hashtag strategy lookups, resolved once instead of per clip
+        hashtag_strategy = self.prompts.get('hashtag_strategy', {})
+        self._category_tags = hashtag_strategy.get('category_tags', {})
+        self._core_tags = hashtag_strategy.get('consistent_core_tags', [])
+        
+        # Prompt templates and platform guideline blocks, rendered once
+        self._caption_template = self.prompts.get('caption_generation_prompt', '')
+        self._hashtag_template = self.prompts.get('hashtag_generation_prompt', '')
+        self._multi_platform_template = self.prompts.get('multi_platform_metadata_prompt', '')
+        self._platform_guidelines = self.prompts.get('platform_caption_guidelines', {})
+        self._guideline_blocks = {
+            platform: (
+                "\n\nPlatform Guidelines:\n"
+                f"- Maximum length: {guidelines.get('max_length', 2200)} characters\n"
+                f"- Style: {guidelines.get('style', 'engaging')}\n"
+            )
+            for platform, guidelines in self._platform_guidelines.items()
+            if guidelines
+        }
+        
         # Default metadata overrides from config
         self.default_description = config.get('default_description', '')
         self.default_hashtags_override = config.get('default_hashtags_override', '')
         
         # Store generated hashtags for consistency
         self._base_hashtags = None
+        self._base_hashtags_lock = threading.Lock()
     
     def generate_caption(self, segment, platform, custom_context=None):
         """
@@ -57,29 +80,20 @@ class MetadataGenerator:
             return self.default_description.strip()
         
         # Get platform-specific guidelines
-        guidelines = self.prompts.get('platform_caption_guidelines', {}).get(platform, {})
-        
-        # Get caption generation prompt
-        prompt_template = self.prompts.get('caption_generation_prompt', '')
+        guidelines = self._platform_guidelines.get(platform, {})
         
         # Extract segment information
         category = segment.get('category', 'entertainment')
         themes = segment.get('themes', [])
         description = segment.get('description', '')
         
-        # Format prompt
-        prompt = prompt_template.format(
+        # Format prompt and add the pre-rendered platform guidelines
+        prompt = self._caption_template.format(
             platform=platform,
             category=category,
             themes=', '.join(themes) if themes else 'general',
             description=description
-        )
-        
-        # Add platform guidelines
-        if guidelines:
-            prompt += f"\n\nPlatform Guidelines:\n"
-            prompt += f"- Maximum length: {guidelines.get('max_length', 2200)} characters\n"
-            prompt += f"- Style: {guidelines.get('style', 'engaging')}\n"
+        ) + self._guideline_blocks.get(platform, '')
         
         # Add custom context if provided
         if custom_context:
@@ -91,19 +105,7 @@ class MetadataGenerator:
             # Call API via video analyzer
             caption = self.video_analyzer._call_api(prompt)
             
-            # Clean up response
-            caption = caption.strip()
-            
-            # Remove quotes if present
-            if caption.startswith('"') and caption.endswith('"'):
-                caption = caption[1:-1]
-            if caption.startswith("'") and caption.endswith("'"):
-                caption = caption[1:-1]
-            
-            # Enforce length limits
-            max_length = guidelines.get('max_length', 2200)
-            if len(caption) > max_length:
-                caption = caption[:max_length-3] + "..."
+            caption = self._clean_caption(caption, guidelines)
             
             logger.info(f"Caption generated for {platform}: {len(caption)} characters")
             return caption
@@ -113,6 +115,33 @@ class MetadataGenerator:
             # Return a basic caption
             return f"Check out this {category} video! {' '.join(['#' + t for t in themes[:3]])}"
     
+    def _clean_caption(self, caption, guidelines):
+        """
+        Strip quotes from an AI caption and enforce the platform length limit
+        
+        Args:
+            caption: Raw caption text
+            guidelines: Platform caption guidelines
+            
+        Returns:
+            Cleaned caption string
+        """
+        # Clean up response
+        caption = caption.strip()
+        
+        # Remove quotes if present
+        if caption.startswith('"') and caption.endswith('"'):
+            caption = caption[1:-1]
+        if caption.startswith("'") and caption.endswith("'"):
+            caption = caption[1:-1]
+        
+        # Enforce length limits
+        max_length = guidelines.get('max_length', 2200)
+        if len(caption) > max_length:
+            caption = caption[:max_length-3] + "..."
+        
+        return caption
+    
     def generate_hashtags(self, segment, platform, use_consistent=None):
         """
         Generate hashtags for a video segment
@@ -136,6 +165,21 @@ class MetadataGenerator:
             max_tags = self.max_hashtags.get(platform, 30)
             return hashtags[:max_tags]
         
+        return self._resolve_hashtags(segment, platform, use_consistent)
+    
+    def _resolve_hashtags(self, segment, platform, use_consistent=None, generated_hashtags=None):
+        """
+        Pick consistent base hashtags or new ones and apply the platform limit
+        
+        Args:
+            segment: Segment dictionary with metadata
+            platform: Target platform
+            use_consistent: Override for consistent hashtags setting
+            generated_hashtags: Hashtags already returned by the AI (skips the API call)
+            
+        Returns:
+            List of hashtags (without # symbol)
+        """
         if use_consistent is None:
             use_consistent = self.consistent_hashtags
         
@@ -145,12 +189,19 @@ class MetadataGenerator:
             platform_hashtags = self._base_hashtags.copy()
         else:
             # Generate new hashtags
-            platform_hashtags = self._generate_new_hashtags(segment, platform)
+            if generated_hashtags is not None:
+                platform_hashtags = self._merge_hashtags(
+                    generated_hashtags, segment.get('category', 'entertainment')
+                )
+            else:
+                platform_hashtags = self._generate_new_hashtags(segment, platform)
             
             # Store as base hashtags if consistency is enabled
-            if use_consistent and not self._base_hashtags:
-                self._base_hashtags = platform_hashtags.copy()
-                logger.info("Stored base hashtags for consistency across platforms")
+            if use_consistent:
+                with self._base_hashtags_lock:
+                    if not self._base_hashtags:
+                        self._base_hashtags = platform_hashtags.copy()
+                        logger.info("Stored base hashtags for consistency across platforms")
         
         # Limit to platform maximum
         max_tags = self.max_hashtags.get(platform, 30)
@@ -168,7 +219,7 @@ class MetadataGenerator:
             List of hashtags
         """
         # Get hashtag generation prompt
-        prompt_template = self.prompts.get('hashtag_generation_prompt', '')
+        prompt_template = self._hashtag_template
         
         # Extract segment information
         category = segment.get('category', 'entertainment')
@@ -194,10 +245,7 @@ class MetadataGenerator:
             # Parse response
             response = response.strip()
             
-            # Remove markdown code blocks if present
-            if response.startswith('```'):
-                lines = response.split('\n')
-                response = '\n'.join(lines[1:-1])
+            response = self._strip_code_fence(response)
             
             # Try to parse as JSON
             try:
@@ -214,25 +262,7 @@ class MetadataGenerator:
                     if word.startswith('#'):
                         hashtags.append(word.lstrip('#'))
             
-            # Add default hashtags
-            all_hashtags = list(self.default_hashtags) + hashtags
-            
-            # Add category-specific hashtags
-            category_tags = self.prompts.get('hashtag_strategy', {}).get('category_tags', {}).get(category, [])
-            all_hashtags.extend(category_tags)
-            
-            # Add consistent core tags
-            core_tags = self.prompts.get('hashtag_strategy', {}).get('consistent_core_tags', [])
-            all_hashtags.extend(core_tags)
-            
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_hashtags = []
-            for tag in all_hashtags:
-                tag_lower = tag.lower()
-                if tag_lower not in seen:
-                    seen.add(tag_lower)
-                    unique_hashtags.append(tag)
+            unique_hashtags = self._merge_hashtags(hashtags, category)
             
             logger.info(f"Generated {len(unique_hashtags)} hashtags for {platform}")
             return unique_hashtags
@@ -242,6 +272,160 @@ class MetadataGenerator:
             # Return default hashtags
             return list(self.default_hashtags)
     
+    def _strip_code_fence(self, response):
+        """Remove a surrounding markdown code block from an AI response"""
+        if response.startswith('```'):
+            lines = response.split('\n')
+            response = '\n'.join(lines[1:-1])
+        return response
+    
+    def _merge_hashtags(self, hashtags, category):
+        """
+        Combine AI hashtags with default, category and core tags
+        
+        Args:
+            hashtags: Hashtags returned by the AI
+            category: Content category
+            
+        Returns:
+            De-duplicated list of hashtags (order preserved)
+        """
+        # Add default hashtags
+        all_hashtags = list(self.default_hashtags) + hashtags
+        
+        # Add category-specific hashtags
+        all_hashtags.extend(self._category_tags.get(category, []))
+        
+        # Add consistent core tags
+        all_hashtags.extend(self._core_tags)
+        
+        # Remove duplicates (case-insensitive) while preserving order
+        unique_hashtags = {}
+        for tag in all_hashtags:
+            unique_hashtags.setdefault(tag.lower(), tag)
+        
+        return list(unique_hashtags.values())
+    
+    def _build_multi_platform_prompt(self, segment, platforms):
+        """
+        Build one prompt asking for captions and hashtags for every platform
+        
+        Args:
+            segment: Segment dictionary with metadata
+            platforms: List of platform names
+            
+        Returns:
+            Prompt string, or None if no combined prompt is configured
+        """
+        prompt_template = self._multi_platform_template
+        if not prompt_template:
+            return None
+        
+        requirements = []
+        for platform in platforms:
+            guidelines = self._platform_guidelines.get(platform, {})
+            requirements.append(
+                f"- {platform}: caption max {guidelines.get('max_length', 2200)} characters, "
+                f"style: {guidelines.get('style', 'engaging')}, "
+                f"maximum {self.max_hashtags.get(platform, 30)} hashtags"
+            )
+        
+        themes = segment.get('themes', [])
+        
+        return prompt_template.format(
+            platforms=', '.join(platforms),
+            category=segment.get('category', 'entertainment'),
+            themes=', '.join(themes) if themes else 'general',
+            description=segment.get('description', ''),
+            platform_requirements='\n'.join(requirements)
+        )
+    
+    def _generate_batched_metadata(self, segment, platforms):
+        """
+        Generate captions and hashtags for all platforms with a single API call
+        
+        Args:
+            segment: Segment dictionary with metadata
+            platforms: List of platform names
+            
+        Returns:
+            Dictionary mapping platform to {'caption', 'hashtags'}, or None
+            if the combined request is unavailable or its response is unusable
+        """
+        prompt = self._build_multi_platform_prompt(segment, platforms)
+        if not prompt:
+            return None
+        
+        logger.info(f"Generating metadata for {', '.join(platforms)} in one request")
+        
+        try:
+            response = self.video_analyzer._call_api(prompt)
+            result = json.loads(self._strip_code_fence(response.strip()))
+        except Exception as e:
+            logger.warning(f"Combined metadata generation failed, falling back to per-platform requests: {e}")
+            return None
+        
+        if not isinstance(result, dict):
+            logger.warning("Combined metadata response is not a JSON object, falling back to per-platform requests")
+            return None
+        
+        batched = {}
+        for platform in platforms:
+            entry = result.get(platform)
+            if not isinstance(entry, dict):
+                continue
+            
+            caption = entry.get('caption')
+            hashtags = entry.get('hashtags')
+            if not isinstance(caption, str) or not caption.strip() or not isinstance(hashtags, list):
+                continue
+            
+            batched[platform] = {
+                'caption': caption,
+                'hashtags': [str(tag).lstrip('#') for tag in hashtags if tag]
+            }
+        
+        return batched
+    
+    def _generate_metadata_concurrently(self, segment, platforms):
+        """
+        Generate captions and hashtags with per-platform requests run in parallel
+        
+        Args:
+            segment: Segment dictionary with metadata
+            platforms: List of platform names
+            
+        Returns:
+            Dictionary mapping platform to (caption, hashtags)
+        """
+        if not platforms:
+            return {}
+        
+        hashtags = {}
+        
+        # Seed consistent base hashtags from the first platform before fanning
+        # out, so the result doesn't depend on which request finishes first
+        if self.consistent_hashtags and not self._base_hashtags:
+            hashtags[platforms[0]] = self.generate_hashtags(segment, platforms[0])
+        
+        with ThreadPoolExecutor(max_workers=len(platforms) * 2) as executor:
+            caption_futures = {
+                platform: executor.submit(self.generate_caption, segment, platform)
+                for platform in platforms
+            }
+            hashtag_futures = {
+                platform: executor.submit(self.generate_hashtags, segment, platform)
+                for platform in platforms if platform not in hashtags
+            }
+            
+            for platform, future in hashtag_futures.items():
+                hashtags[platform] = future.result()
+            
+            return {
+                platform: (caption_futures[platform].result(), hashtags[platform])
+                for platform in platforms
+            }
+    
     def generate_metadata_for_clip(self, clip_info, platforms):
         """
         Generate complete metadata for a clip across multiple platforms
@@ -256,9 +440,28 @@ class MetadataGenerator:
         segment = clip_info.get('segment', {})
         metadata = {}
         
+        # Ask for every platform in one request unless config overrides
+        # already cover both captions and hashtags
+        batched = {}
+        if not (
+            self.default_description and self.default_description.strip()
+            and self.default_hashtags_override and self.default_hashtags_override.strip()
+        ):
+            batched = self._generate_batched_metadata(segment, platforms) or {}
+        
+        # Platforms missing from the combined response are asked separately
+        separate = self._generate_metadata_concurrently(
+            segment, [p for p in platforms if p not in batched]
+        )
+        
         for platform in platforms:
-            caption = self.generate_caption(segment, platform)
-            hashtags = self.generate_hashtags(segment, platform)
+            generated = batched.get(platform)
+            
+            if generated is None:
+                caption, hashtags = separate[platform]
+            else:
+                caption = self._metadata_caption(generated['caption'], platform)
+                hashtags = self._metadata_hashtags(segment, platform, generated['hashtags'])
             
             metadata[platform] = {
                 'caption': caption,
@@ -269,6 +472,21 @@ class MetadataGenerator:
         
         return metadata
     
+    def _metadata_caption(self, caption, platform):
+        """Apply the config override or clean an AI caption from a combined request"""
+        if self.default_description and self.default_description.strip():
+            return self.default_description.strip()
+        
+        guidelines = self._platform_guidelines.get(platform, {})
+        return self._clean_caption(caption, guidelines)
+    
+    def _metadata_hashtags(self, segment, platform, hashtags):
+        """Apply the config override or resolve AI hashtags from a combined request"""
+        if self.default_hashtags_override and self.default_hashtags_override.strip():
+            return self.generate_hashtags(segment, platform)
+        
+        return self._resolve_hashtags(segment, platform, generated_hashtags=hashtags)
+    
     def reset_base_hashtags(self):
         """Reset base hashtags to force regeneration"""
         self._base_hashtags = None
@@ -296,7 +514,7 @@ class MetadataGenerator:
         Returns:
             Formatted string
         """
-        guidelines = self.prompts.get('platform_caption_guidelines', {}).get(platform, {})
+        guidelines = self._platform_guidelines.get(platform, {})
         hashtag_placement = guidelines.get('hashtag_placement', 'end of caption')
         
         # Format hashtags
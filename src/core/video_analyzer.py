@@ -2,22 +2,221 @@
 Video Analyzer - AI-powered video content analysis using GitHub Models API
 """
 import os
+import re
 import json
 import logging
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+import bisect
 import hashlib
+import heapq
 import requests
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import time
+from datetime import datetime
 import yaml
 import subprocess
 import tempfile
 from pathlib import Path
 
+from .clip_extractor import FFMPEG_LOG_ARGS
+
+try:
+    import orjson
+except ImportError:  # optional speedup, stdlib json is the fallback
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional compact cache format, JSON is the fallback
+    msgpack = None
+
 logger = logging.getLogger(__name__)
 
+# Number of analysis results kept in memory in front of the disk cache
+MEMORY_CACHE_SIZE = 128
+
+# Transcript characters sent per AI request (~12.5k tokens)
+MAX_TRANSCRIPT_CHARS = 50000
+
+# Seconds an API token is reused before it is read again, so rotated keys are
+# picked up (same as CREDENTIAL_CACHE_TTL in utils/credential_manager.py)
+TOKEN_CACHE_TTL = 300
+
+# Closing instructions appended to every single-video analysis prompt
+ANALYSIS_INSTRUCTIONS = "\n\n## Instructions\nAnalyze the transcript above to identify viral-worthy segments. Focus on the spoken content, narrative flow, and emotional moments captured in the text. Identify segments that would work well as 15-60 second clips for social media."
+
+# Trailing commas before a closing bracket, a common LLM JSON slip
+_TRAILING_COMMA_RE = re.compile(r',\s*([}\]])')
+
+# Sort/filter key for analyzed segments; analyze_video guarantees every segment
+# has it (the public filter/rank helpers also accept segments without one)
+_score = itemgetter('viral_score')
+
+
+def _json_loads(data):
+    """Parse JSON from str or UTF-8 bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _preview(body, limit):
+    """Decode only the first `limit` bytes of a response body for logging"""
+    return body[:limit].decode('utf-8', errors='replace')
+
+
+@lru_cache(maxsize=64)
+def _serialize_frozen_metadata(items):
+    """Pretty-print metadata for the analysis prompt (cached by content)"""
+    return json.dumps(dict(items), indent=2)
+
+
+def _serialize_metadata(metadata):
+    """Pretty-print video metadata, reusing the result for repeated metadata"""
+    try:
+        return _serialize_frozen_metadata(tuple(metadata.items()))
+    except TypeError:
+        # Unhashable values (lists, nested dicts) cannot be cached
+        return json.dumps(metadata, indent=2)
+
+
+def _parse_llm_json(text):
+    """
+    Parse JSON returned by the model, tolerating common defects
+    
+    The fast strict parse is tried first. Only if that fails is the text
+    trimmed to its outermost object/array, stripped of trailing commas and
+    parsed leniently (NaN, control characters in strings).
+    
+    Raises:
+        ValueError: If the text cannot be parsed even leniently
+    """
+    try:
+        return _json_loads(text)
+    except ValueError:
+        pass
+    
+    start = min((i for i in (text.find('{'), text.find('[')) if i != -1), default=0)
+    end = max(text.rfind('}'), text.rfind(']'))
+    if end > start:
+        text = text[start:end + 1]
+    return json.loads(_TRAILING_COMMA_RE.sub(r'\1', text), strict=False)
+
+
+def _cache_dumps(obj):
+    """Serialize a cache entry (msgpack when installed, otherwise JSON)"""
+    if msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True, default=_to_builtin)
+    return _json_dumps(obj)
+
+
+def _cache_loads(data):
+    """Deserialize a cache entry written by _cache_dumps"""
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False)
+    return _json_loads(data)
+
+
+# Cache files are named for their format so switching formats never
+# misreads an old file
+CACHE_SUFFIX = '.msgpack' if msgpack is not None else '.json'
+
+
+def _speech_regions(audio, sample_rate=16000, frame_seconds=0.03, min_silence_seconds=1.0,
+                    pad_seconds=0.25):
+    """
+    Find the speech regions of a mono float32 signal with a simple energy VAD
+    
+    Frames louder than a multiple of the noise floor count as speech. Gaps
+    shorter than min_silence_seconds are kept, and regions are padded so word
+    onsets and tails are not clipped.
+    
+    Returns:
+        List of (start_sample, end_sample) tuples, or None if trimming would
+        remove less than 10% of the audio
+    """
+    import numpy as np
+    
+    frame_len = int(sample_rate * frame_seconds)
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return None
+    
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+    threshold = max(np.percentile(energy, 10) * 3, 0.005)
+    voiced = np.flatnonzero(energy > threshold)
+    if len(voiced) == 0:
+        return None
+    
+    # Split where consecutive voiced frames are separated by a long silence
+    max_gap = int(min_silence_seconds / frame_seconds)
+    breaks = np.flatnonzero(np.diff(voiced) > max_gap)
+    starts = np.concatenate(([voiced[0]], voiced[breaks + 1]))
+    ends = np.concatenate((voiced[breaks], [voiced[-1]])) + 1
+    
+    pad = int(pad_seconds * sample_rate)
+    regions = [
+        (max(0, int(start) * frame_len - pad), min(len(audio), int(end) * frame_len + pad))
+        for start, end in zip(starts, ends)
+    ]
+    
+    if sum(end - start for start, end in regions) > 0.9 * len(audio):
+        return None
+    return regions
+
+
+def _restore_timestamps(result, regions, sample_rate=16000):
+    """Map segment and word times on VAD-trimmed audio back to the original timeline"""
+    # Start of each region on the trimmed timeline, and its shift to the original
+    trimmed_starts = []
+    shifts = []
+    position = 0
+    for start, end in regions:
+        trimmed_starts.append(position / sample_rate)
+        shifts.append((start - position) / sample_rate)
+        position += end - start
+    
+    def restore(t):
+        return t + shifts[max(bisect.bisect_right(trimmed_starts, t) - 1, 0)]
+    
+    for segment in result.get('segments', []):
+        segment['start'] = restore(segment['start'])
+        segment['end'] = restore(segment['end'])
+        for word in segment.get('words') or []:
+            word['start'] = restore(word['start'])
+            word['end'] = restore(word['end'])
+    
+    return result
+
+
+def _to_builtin(obj):
+    """Convert numpy scalars (e.g. Whisper word timings) for serializers that reject them"""
+    if hasattr(obj, 'item'):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def _json_dumps(obj):
+    """Serialize to compact UTF-8 JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_to_builtin, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(',', ':'), default=_to_builtin).encode()
+
 
 class VideoAnalyzer:
     """Analyze videos using AI to identify viral-worthy segments"""
     
+    # Decrypted API tokens shared by all instances as (expires_at, token), keyed
+    # by credential manager (weakly, so entries go away with their manager)
+    _token_cache = weakref.WeakKeyDictionary()
+    
     def __init__(self, config, prompts_config, credential_manager):
         """
         Initialize video analyzer
@@ -37,44 +236,156 @@ class VideoAnalyzer:
         self.enable_cache = config.get('enable_cache', True)
         self.cache_dir = config.get('cache_dir', 'cache/ai_responses')
         self.cache_expiration_hours = config.get('cache_expiration_hours', 24)
+        # Maximum AI requests in flight at once during batch analysis
+        self.max_concurrency = config.get('max_concurrency', 5)
+        self._expiry_seconds = self.cache_expiration_hours * 3600
+        # How long past expiration a cached analysis may still be served
+        # while a fresh one is computed in the background (0 disables)
+        self._stale_seconds = config.get('cache_stale_hours', 0) * 3600
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
         
         # Whisper model configuration
         self.whisper_model_size = config.get('whisper_model_size', 'base')
         self.whisper_model = None  # Lazy load Whisper model
+        # auto: faster-whisper when installed, otherwise openai-whisper
+        self.whisper_backend = config.get('whisper_backend', 'auto')
+        self._whisper_backend_in_use = None
+        # auto: CUDA when available, otherwise CPU
+        self.whisper_device = config.get('whisper_device', 'auto')
+        # Skip long silences before transcription (off by default: the
+        # energy VAD used with openai-whisper can drop quiet speech)
+        self.whisper_vad = config.get('whisper_vad', False)
+        self._whisper_fp16 = False
+        # Batch analyses share one model; transcribe one file at a time
+        self._whisper_lock = threading.Lock()
+        # Guards the lazy load, which may run in a background thread
+        self._whisper_load_lock = threading.Lock()
+        
+        # Persistent HTTP session so repeated API calls (analysis, captions,
+        # hashtags) reuse one keep-alive TLS connection. Rate limits and
+        # transient server errors are retried with backoff.
+        self._session = requests.Session()
+        retries = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=None,  # retry POST too
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        self._session.headers.update({"Content-Type": "application/json"})
+        
+        # API token, resolved on first use and set on the session headers
+        self._token = None
+        self._token_expires = 0
+        
+        # In-memory LRU over the disk cache: cache_path -> (timestamp, data)
+        self._mem_cache = OrderedDict()
+        self._mem_cache_lock = threading.Lock()
+        # Disk writes happen off the analysis path; the memory cache already
+        # serves the entry. Executor threads are joined at interpreter exit.
+        self._cache_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-writer")
         
         # Ensure cache directory exists
         os.makedirs(self.cache_dir, exist_ok=True)
     
     def _get_api_token(self):
-        """Get GitHub API token from credential manager or environment"""
-        token = self.credential_manager.decrypt_credential('github_api', 'token')
-        if not token:
-            token = os.getenv('GITHUB_TOKEN')
-        return token
+        """Get GitHub API token from credential manager or environment (cached for TOKEN_CACHE_TTL)"""
+        now = time.monotonic()
+        if self._token is None or self._token_expires < now:
+            expires_at, token = VideoAnalyzer._token_cache.get(self.credential_manager, (0, None))
+            if expires_at < now:
+                token = self.credential_manager.decrypt_credential('github_api', 'token')
+                if not token:
+                    token = os.getenv('GITHUB_TOKEN')
+                expires_at = now + TOKEN_CACHE_TTL
+                if token:
+                    VideoAnalyzer._token_cache[self.credential_manager] = (expires_at, token)
+            if token:
+                self._token = token
+                self._token_expires = expires_at
+                self._session.headers["Authorization"] = f"Bearer {token}"
+            else:
+                self.invalidate_token()
+        return self._token
+    
+    def invalidate_token(self):
+        """Forget the cached API token so the next call reloads it (e.g. after rotation)"""
+        self._token = None
+        self._session.headers.pop("Authorization", None)
+        VideoAnalyzer._token_cache.pop(self.credential_manager, None)
+    
+    @classmethod
+    def invalidate_tokens(cls):
+        """Forget API tokens cached for every instance"""
+        cls._token_cache.clear()
     
     def _get_cache_path(self, video_path, prompt_type):
         """Generate cache file path for video and prompt type"""
-        # Create hash of video path and prompt type
-        cache_key = hashlib.md5(f"{video_path}_{prompt_type}".encode()).hexdigest()
-        return os.path.join(self.cache_dir, f"{cache_key}.json")
+        # Create hash of video path, its modification time and size, and
+        # prompt type, so a replaced or edited video gets a fresh analysis
+        try:
+            st = os.stat(video_path)
+            key = f"{video_path}_{st.st_mtime_ns}_{st.st_size}_{prompt_type}"
+        except OSError:
+            key = f"{video_path}_{prompt_type}"
+        cache_key = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{cache_key}{CACHE_SUFFIX}")
     
-    def _load_from_cache(self, cache_path):
-        """Load analysis from cache if valid"""
-        if not self.enable_cache or not os.path.exists(cache_path):
+    def _remember(self, cache_path, cached_time, data):
+        """Store an entry in the in-memory LRU, evicting the oldest"""
+        with self._mem_cache_lock:
+            self._mem_cache[cache_path] = (cached_time, data)
+            self._mem_cache.move_to_end(cache_path)
+            if len(self._mem_cache) > MEMORY_CACHE_SIZE:
+                self._mem_cache.popitem(last=False)
+    
+    def _load_from_cache(self, cache_path, max_age=None):
+        """
+        Load analysis from cache if valid
+        
+        Args:
+            cache_path: Cache file path
+            max_age: Maximum entry age in seconds (defaults to the cache expiration)
+        """
+        if not self.enable_cache:
             return None
         
+        if max_age is None:
+            max_age = self._expiry_seconds
+        
+        # Memory first: no file read or JSON decode on repeat lookups
+        with self._mem_cache_lock:
+            entry = self._mem_cache.get(cache_path)
+            if entry is not None:
+                age = time.time() - entry[0]
+                if age < max_age:
+                    self._mem_cache.move_to_end(cache_path)
+                    logger.debug("Loaded analysis from memory cache: %s", cache_path)
+                    return entry[1]
+                if age >= self._expiry_seconds + self._stale_seconds:
+                    del self._mem_cache[cache_path]
+        
         try:
-            with open(cache_path, 'r') as f:
-                cached = json.load(f)
+            with open(cache_path, 'rb') as f:
+                cached = _cache_loads(f.read())
             
-            # Check if cache is expired
-            cached_time = datetime.fromisoformat(cached.get('timestamp'))
-            expiration = timedelta(hours=self.cache_expiration_hours)
+            # Check if cache is expired (epoch seconds; older files stored ISO strings)
+            cached_time = cached.get('timestamp')
+            if isinstance(cached_time, str):
+                cached_time = datetime.fromisoformat(cached_time).timestamp()
             
-            if datetime.now() - cached_time < expiration:
+            if time.time() - cached_time < max_age:
+                data = cached.get('data')
                 logger.info(f"Loaded analysis from cache: {cache_path}")
-                return cached.get('data')
+                self._remember(cache_path, cached_time, data)
+                return data
         
+        except FileNotFoundError:
+            return None
         except Exception as e:
             logger.warning(f"Failed to load cache: {e}")
         
@@ -86,13 +397,33 @@ class VideoAnalyzer:
             return
         
         try:
+            now = time.time()
+            self._remember(cache_path, now, data)
+            
             cache_data = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now,
                 'data': data
             }
             
-            with open(cache_path, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            # Serialize now, while the caller cannot yet modify data
+            self._cache_writer.submit(self._write_cache_file, cache_path, _cache_dumps(cache_data))
+        
+        except Exception as e:
+            logger.error(f"Failed to save cache: {e}")
+    
+    def _write_cache_file(self, cache_path, payload):
+        """Write serialized cache data to disk (runs on the cache writer thread)"""
+        try:
+            # Write to a sibling temp file and rename, so a crash mid-write
+            # never leaves a truncated cache file behind
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
             
             logger.info(f"Saved analysis to cache: {cache_path}")
         
@@ -114,11 +445,6 @@ class VideoAnalyzer:
         if not token:
             raise ValueError("GitHub API token not found. Set GITHUB_TOKEN environment variable or configure credentials.")
         
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {token}"
-        }
-        
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
@@ -132,42 +458,45 @@ class VideoAnalyzer:
         }
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.api_endpoint,
-                headers=headers,
-                json=payload,
+                data=_json_dumps(payload),  # Content-Type is set on the session
                 timeout=60
             )
             
             # Log status code for debugging
-            logger.debug(f"API response status code: {response.status_code}")
+            logger.debug("API response status code: %s", response.status_code)
             
             # Check if response is successful
             if response.status_code != 200:
                 logger.error(f"API returned non-200 status code: {response.status_code}")
-                logger.error(f"Response text: {response.text[:500]}")  # Log first 500 chars
+                logger.error(f"Response text: {_preview(response.content, 500)}")  # Log first 500 chars
+                if response.status_code == 401:
+                    # Token may have been rotated; reload it on the next call
+                    self.invalidate_token()
                 response.raise_for_status()
             
             # Check if response has content
-            if not response.text or response.text.strip() == '':
+            if not response.content.strip():
                 logger.error("API returned empty response")
                 raise ValueError("Empty response from API")
             
             # Log raw response for debugging (first 200 chars)
-            logger.debug(f"Raw API response (first 200 chars): {response.text[:200]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Raw API response (first 200 chars): %s", _preview(response.content, 200))
             
-            # Parse JSON response
+            # Parse JSON response straight from the raw bytes
             try:
-                result = response.json()
-            except json.JSONDecodeError as e:
+                result = _json_loads(response.content)
+            except ValueError as e:
                 logger.error(f"Failed to parse API response as JSON: {e}")
-                logger.error(f"Response text: {response.text[:500]}")
+                logger.error(f"Response text: {_preview(response.content, 500)}")
                 raise ValueError(f"Invalid JSON response from API: {e}")
             
             # Extract content from response
             if 'choices' not in result or len(result['choices']) == 0:
                 logger.error(f"API response missing 'choices' key or empty choices")
-                logger.error(f"Response structure: {json.dumps(result, indent=2)[:500]}")
+                logger.error(f"Response structure: {_preview(response.content, 500)}")
                 raise ValueError("Invalid API response structure")
             
             content = result['choices'][0]['message']['content']
@@ -183,7 +512,7 @@ class VideoAnalyzer:
             logger.error(f"API request failed: {e}")
             if hasattr(e, 'response') and e.response is not None:
                 logger.error(f"Response status: {e.response.status_code}")
-                logger.error(f"Response text: {e.response.text[:500]}")
+                logger.error(f"Response text: {_preview(e.response.content, 500)}")
             raise
     
     def _check_ffmpeg(self):
@@ -198,105 +527,125 @@ class VideoAnalyzer:
             logger.error("FFmpeg not found. Please install FFmpeg.")
             return False
     
-    def _extract_audio(self, video_path, output_audio_path=None):
-        """
-        Extract audio from video using FFmpeg
-        
-        Args:
-            video_path: Path to video file
-            output_audio_path: Optional path for output audio file
-            
-        Returns:
-            Path to extracted audio file or None if failed
-        """
-        if not self._check_ffmpeg():
-            raise RuntimeError("FFmpeg is required but not found")
-        
-        # Create output path if not provided
-        if output_audio_path is None:
-            # Create temp file in cache directory
-            temp_dir = os.path.join(self.cache_dir, 'temp_audio')
-            os.makedirs(temp_dir, exist_ok=True)
+    def _load_whisper_model(self):
+        """Load Whisper model (lazy loading)"""
+        with self._whisper_load_lock:
+            if self.whisper_model is None and self.whisper_backend in ('auto', 'faster-whisper'):
+                try:
+                    from faster_whisper import WhisperModel
+                    import ctranslate2
+                except ImportError:
+                    if self.whisper_backend == 'faster-whisper':
+                        raise ImportError(
+                            "faster-whisper is not installed. Install it with: pip install faster-whisper"
+                        )
+                else:
+                    # int8 weights; float16 activations where a GPU is present
+                    if self.whisper_device == 'auto':
+                        on_gpu = ctranslate2.get_cuda_device_count() > 0
+                    else:
+                        on_gpu = self.whisper_device == 'cuda'
+                    logger.info(f"Loading faster-whisper model: {self.whisper_model_size}")
+                    self.whisper_model = WhisperModel(
+                        self.whisper_model_size,
+                        device='cuda' if on_gpu else 'cpu',
+                        compute_type='int8_float16' if on_gpu else 'int8'
+                    )
+                    self._whisper_backend_in_use = 'faster-whisper'
+                    logger.info("Whisper model loaded successfully")
             
-            video_name = Path(video_path).stem
-            output_audio_path = os.path.join(temp_dir, f"{video_name}_audio.wav")
-        
-        logger.info(f"Extracting audio from video: {video_path}")
+            if self.whisper_model is None:
+                try:
+                    import whisper
+                    logger.info(f"Loading Whisper model: {self.whisper_model_size}")
+                    device = None if self.whisper_device == 'auto' else self.whisper_device
+                    self.whisper_model = whisper.load_model(self.whisper_model_size, device=device)
+                    self._whisper_backend_in_use = 'openai'
+                    # Half-precision decoding on GPU; CPU only supports FP32
+                    self._whisper_fp16 = self.whisper_model.device.type == 'cuda'
+                    logger.info(f"Whisper running on {self.whisper_model.device} (fp16={self._whisper_fp16})")
+                    logger.info("Whisper model loaded successfully")
+                except ImportError:
+                    raise ImportError(
+                        "Whisper is not installed. Install it with: pip install openai-whisper"
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to load Whisper model: {e}")
+                    raise
         
-        # FFmpeg command to extract audio
-        cmd = [
-            'ffmpeg',
-            '-i', video_path,
-            '-vn',  # No video
-            '-acodec', 'pcm_s16le',  # PCM format for Whisper
-            '-ar', '16000',  # 16kHz sample rate (pre-convert to Whisper's expected format)
-            '-ac', '1',  # Mono audio
-            '-y',  # Overwrite output file
-            output_audio_path
-        ]
+        return self.whisper_model
+    
+    def _preload_whisper_model(self):
+        """Start loading the Whisper model in the background"""
+        if self.whisper_model is not None:
+            return
         
-        try:
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                check=True
-            )
-            
-            if os.path.exists(output_audio_path) and os.path.getsize(output_audio_path) > 0:
-                logger.info(f"Audio extracted successfully: {output_audio_path}")
-                return output_audio_path
-            else:
-                logger.error("FFmpeg completed but audio file not found or empty")
-                return None
+        def load():
+            try:
+                self._load_whisper_model()
+            except Exception:
+                # Reported again when transcription retries the load
+                pass
         
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Audio extraction failed: {e.stderr.decode()}")
-            return None
-        except Exception as e:
-            logger.error(f"Audio extraction failed: {e}")
-            return None
+        threading.Thread(target=load, name="whisper-preload", daemon=True).start()
     
-    def _load_whisper_model(self):
-        """Load Whisper model (lazy loading)"""
-        if self.whisper_model is None:
-            try:
-                import whisper
-                logger.info(f"Loading Whisper model: {self.whisper_model_size}")
-                self.whisper_model = whisper.load_model(self.whisper_model_size)
-                logger.info("Whisper model loaded successfully")
-            except ImportError:
-                raise ImportError(
-                    "Whisper is not installed. Install it with: pip install openai-whisper"
-                )
-            except Exception as e:
-                logger.error(f"Failed to load Whisper model: {e}")
-                raise
+    def warmup(self):
+        """
+        Start loading the Whisper model in the background
         
-        return self.whisper_model
+        Call once in the process that will transcribe, before work is queued,
+        so the first video doesn't wait on the model load.
+        """
+        self._preload_whisper_model()
     
-    def _transcribe_audio(self, audio_path):
+    def _transcribe_audio(self, audio):
         """
         Transcribe audio using Whisper
         
         Args:
-            audio_path: Path to audio file
+            audio: Path to audio file, or 16kHz mono float32 samples
             
         Returns:
             Dictionary with transcription results including word-level timestamps, or None if failed
         """
-        if not audio_path or not os.path.exists(audio_path):
-            logger.error(f"Audio file not found: {audio_path}")
+        if isinstance(audio, str):
+            if not os.path.exists(audio):
+                logger.error(f"Audio file not found: {audio}")
+                return None
+            audio_desc = audio
+        elif audio is None or len(audio) == 0:
+            logger.error("No audio to transcribe")
             return None
+        else:
+            audio_desc = f"{len(audio) / 16000:.1f}s of in-memory audio"
         
         try:
-            # Load Whisper model
+            # Load Whisper model (guarded by its own lock)
             model = self._load_whisper_model()
             
-            logger.info(f"Transcribing audio: {audio_path}")
+            # Drop long silences from in-memory audio; faster-whisper has its own
+            # (Silero) VAD and restores timestamps itself. Checked against the
+            # loaded backend, since 'auto' may resolve to faster-whisper.
+            regions = None
+            if (self.whisper_vad and not isinstance(audio, str)
+                    and self._whisper_backend_in_use != 'faster-whisper'):
+                regions = _speech_regions(audio)
             
-            # Transcribe audio with word-level timestamps
-            result = model.transcribe(audio_path, word_timestamps=True)
+            with self._whisper_lock:
+                logger.info(f"Transcribing audio: {audio_desc}")
+                
+                # Transcribe audio with word-level timestamps
+                if self._whisper_backend_in_use == 'faster-whisper':
+                    result = self._transcribe_faster_whisper(model, audio)
+                else:
+                    if regions:
+                        import numpy as np
+                        trimmed = np.concatenate([audio[start:end] for start, end in regions])
+                        logger.info(f"Voice activity detection kept {len(trimmed) / 16000:.1f}s of {audio_desc}")
+                        result = model.transcribe(trimmed, word_timestamps=True, fp16=self._whisper_fp16)
+                        result = _restore_timestamps(result, regions)
+                    else:
+                        result = model.transcribe(audio, word_timestamps=True, fp16=self._whisper_fp16)
             
             # Validate result
             if not result or 'text' not in result:
@@ -310,7 +659,8 @@ class VideoAnalyzer:
                 return None
             
             logger.info(f"Transcription completed. Length: {len(transcript_text)} characters")
-            logger.debug(f"Transcript preview: {transcript_text[:200]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Transcript preview: %s...", transcript_text[:200])
             
             # Log if word-level timestamps are available
             if 'segments' in result and result['segments']:
@@ -322,9 +672,51 @@ class VideoAnalyzer:
             logger.error(f"Audio transcription failed: {e}", exc_info=True)
             return None
     
-    def _extract_frames(self, video_path, interval_seconds=2, max_frames=10):
+    def _transcribe_faster_whisper(self, model, audio):
+        """
+        Transcribe with faster-whisper and return an openai-whisper style result
+        
+        Args:
+            model: faster_whisper.WhisperModel instance
+            audio: Path to audio file, or 16kHz mono float32 samples
+            
+        Returns:
+            Dictionary with 'text', 'segments' (with 'words') and 'language'
+        """
+        # Greedy decoding, as openai-whisper's transcribe() does by default
+        segments, info = model.transcribe(
+            audio, beam_size=1, word_timestamps=True, vad_filter=self.whisper_vad
+        )
+        
+        result_segments = [
+            {
+                'id': segment.id,
+                'start': segment.start,
+                'end': segment.end,
+                'text': segment.text,
+                'words': [
+                    {'word': w.word, 'start': w.start, 'end': w.end, 'probability': w.probability}
+                    for w in (segment.words or [])
+                ]
+            }
+            for segment in segments  # generator: decoding happens here
+        ]
+        
+        return {
+            'text': ''.join(segment['text'] for segment in result_segments),
+            'segments': result_segments,
+            'language': info.language
+        }
+    
+    def _extract_audio_and_frames(self, video_path, interval_seconds=2, max_frames=10):
         """
-        Extract frames from video at regular intervals
+        Extract audio and key frames with a single FFmpeg invocation
+        
+        The video is demuxed and decoded once for both outputs instead of
+        once per output. Audio is streamed over stdout as 16kHz mono PCM and
+        handed to Whisper in memory, so no WAV file is written and re-read.
+        Falls back to audio-only extraction if the combined command fails
+        (e.g. the file has no video stream).
         
         Args:
             video_path: Path to video file
@@ -332,59 +724,297 @@ class VideoAnalyzer:
             max_frames: Maximum number of frames to extract
             
         Returns:
-            List of frame file paths or empty list if failed
+            Tuple of (float32 audio samples or None, list of frame file paths)
         """
         if not self._check_ffmpeg():
-            logger.warning("FFmpeg not available, skipping frame extraction")
-            return []
+            raise RuntimeError("FFmpeg is required but not found")
         
-        # Create temp directory for frames
-        temp_dir = os.path.join(self.cache_dir, 'temp_frames')
-        os.makedirs(temp_dir, exist_ok=True)
+        import numpy as np
         
         video_name = Path(video_path).stem
-        frame_pattern = os.path.join(temp_dir, f"{video_name}_frame_%03d.jpg")
         
-        logger.info(f"Extracting frames from video: {video_path}")
+        frames_dir = os.path.join(self.cache_dir, 'temp_frames')
+        os.makedirs(frames_dir, exist_ok=True)
+        frame_pattern = os.path.join(frames_dir, f"{video_name}_frame_%03d.jpg")
+        
+        logger.info(f"Extracting audio and frames from video: {video_path}")
         
-        # FFmpeg command to extract frames
-        cmd = [
+        audio_cmd = [
             'ffmpeg',
+            *FFMPEG_LOG_ARGS,
+            '-threads', '0',  # Use all cores for decoding
             '-i', video_path,
-            '-vf', f'fps=1/{interval_seconds}',  # Extract 1 frame every N seconds
-            '-frames:v', str(max_frames),  # Limit number of frames
-            '-y',
-            frame_pattern
+            # Output 1: raw 16kHz mono PCM for Whisper, on stdout
+            '-map', '0:a:0',
+            '-f', 's16le',
+            '-acodec', 'pcm_s16le',
+            '-ar', '16000',
+            '-ac', '1',
+            'pipe:1'
+        ]
+        frames_cmd = [
+            # Output 2: one frame every N seconds
+            '-map', '0:v:0',
+            '-vf', f'fps=1/{interval_seconds}',
+            '-frames:v', str(max_frames),
+            '-y', frame_pattern
         ]
         
+        frames = []
         try:
             result = subprocess.run(
-                cmd,
+                audio_cmd + frames_cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 check=True
             )
+            prefix = f"{video_name}_frame_"
+            with os.scandir(frames_dir) as entries:
+                frames = sorted(
+                    entry.path for entry in entries
+                    if entry.name.startswith(prefix) and entry.name.endswith('.jpg')
+                )
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"Combined extraction failed, extracting audio only: {e.stderr.decode()}")
+            try:
+                result = subprocess.run(
+                    audio_cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    check=True
+                )
+            except subprocess.CalledProcessError as e:
+                logger.error(f"Audio extraction failed: {e.stderr.decode()}")
+                return None, []
+        
+        if not result.stdout:
+            logger.error("FFmpeg completed but produced no audio")
+            return None, frames
+        
+        # Same conversion whisper.load_audio applies to FFmpeg's output
+        audio = np.frombuffer(result.stdout, np.int16).flatten().astype(np.float32) / 32768.0
+        logger.info(f"Extracted {len(audio) / 16000:.1f}s of audio and {len(frames)} frames")
+        
+        return audio, frames
+    
+    def _transcribe_video(self, video_path):
+        """
+        Extract and transcribe a video's audio
+        
+        Args:
+            video_path: Path to video file
             
-            # Find extracted frames
-            frames = sorted([
-                os.path.join(temp_dir, f) 
-                for f in os.listdir(temp_dir) 
-                if f.startswith(f"{video_name}_frame_") and f.endswith('.jpg')
-            ])
+        Returns:
+            Tuple of (transcription result, number of key frames, error result).
+            On failure the first two are None/0 and the error result is the
+            dictionary analyze_video should return.
+        """
+        # Transcripts depend only on the video and the Whisper setup, so they
+        # outlive analysis results: prompt or model changes skip Whisper
+        transcript_cache_path = self._get_cache_path(
+            video_path,
+            f"transcript_{self.whisper_backend}_{self.whisper_model_size}_{'vad' if self.whisper_vad else 'full'}"
+        )
+        cached = self._load_from_cache(transcript_cache_path, max_age=float('inf'))
+        if cached:
+            logger.info("Using cached transcription")
+            return cached['transcription'], cached['frame_count'], None
+        
+        # Load Whisper while FFmpeg decodes; transcription waits for it
+        self._preload_whisper_model()
+        
+        # Step 1: Extract audio and key frames from video in one pass
+        logger.info("Step 1/3: Extracting audio and key frames from video...")
+        audio, frames = self._extract_audio_and_frames(video_path, interval_seconds=2, max_frames=10)
+        
+        # Clean up frames (we're not using them yet, but they're available for future vision models)
+        for frame_path in frames:
+            try:
+                if os.path.exists(frame_path):
+                    os.remove(frame_path)
+                    logger.debug("Cleaned up frame: %s", frame_path)
+            except Exception as e:
+                logger.warning(f"Failed to clean up frame: {e}")
+        
+        if audio is None:
+            logger.error("Failed to extract audio from video")
+            return None, 0, {
+                'segments': [],
+                'overall_assessment': 'Analysis failed: Could not extract audio from video',
+                'error': 'Audio extraction failed'
+            }
+        
+        # Step 2: Transcribe audio using Whisper
+        logger.info("Step 2/3: Transcribing audio with Whisper...")
+        transcription_result = self._transcribe_audio(audio)
+        del audio  # Release the sample buffer before the API call
+        
+        if not transcription_result:
+            logger.error("Failed to transcribe audio")
+            return None, 0, {
+                'segments': [],
+                'overall_assessment': 'Analysis failed: Could not transcribe audio',
+                'error': 'Transcription failed'
+            }
+        
+        if not transcription_result.get('text', '').strip():
+            logger.error("Transcription returned empty text")
+            return None, 0, {
+                'segments': [],
+                'overall_assessment': 'Analysis failed: Empty transcription',
+                'error': 'Empty transcript'
+            }
+        
+        logger.info(f"Transcription successful: {len(transcription_result['text'].strip())} characters")
+        self._save_to_cache(transcript_cache_path, {
+            'transcription': transcription_result,
+            'frame_count': len(frames)
+        })
+        return transcription_result, len(frames), None
+    
+    def _truncate_transcript(self, transcript_text):
+        """Shorten very long transcripts, keeping the beginning and end"""
+        # GPT-4o has ~128k token context, but we'll be conservative
+        # Estimate ~4 chars per token, and leave room for prompt + response
+        if len(transcript_text) <= MAX_TRANSCRIPT_CHARS:
+            return transcript_text
+        
+        logger.warning(f"Transcript is very long ({len(transcript_text)} chars). Truncating to {MAX_TRANSCRIPT_CHARS} chars.")
+        # Keep first 75% and last 25% to preserve beginning and end
+        first_part_len = int(MAX_TRANSCRIPT_CHARS * 0.75)
+        last_part_len = MAX_TRANSCRIPT_CHARS - first_part_len
+        
+        transcript_text = (
+            transcript_text[:first_part_len] + 
+            "\n\n[... middle section truncated for length ...]\n\n" +
+            transcript_text[-last_part_len:]
+        )
+        logger.info(f"Truncated transcript to {len(transcript_text)} chars")
+        return transcript_text
+    
+    def _build_video_context(self, video_path, transcription_result, transcript_text, frame_count,
+                             video_metadata=None):
+        """Build the transcript, timing, metadata and frame sections of a prompt"""
+        # Collect the pieces and join once; repeated += would copy the
+        # (up to 50k character) transcript for every appended line
+        parts = [f"\n\n## Video Transcript\n\nThe following is the complete transcript of the video:\n\n\"\"\"\n{transcript_text}\n\"\"\"\n"]
+        
+        # Add segment timing information if available
+        if 'segments' in transcription_result and transcription_result['segments']:
+            parts.append("\n\n## Transcript Segments with Timestamps\n")
+            parts.append("The following segments show the exact timing of spoken content:\n\n")
+            for seg in transcription_result['segments'][:20]:  # First 20 segments
+                text = seg.get('text', '').strip()
+                if text:
+                    parts.append(f"[{seg.get('start', 0):.1f}s - {seg.get('end', 0):.1f}s]: {text}\n")
             
-            if frames:
-                logger.info(f"Extracted {len(frames)} frames")
-                return frames
-            else:
-                logger.warning("No frames extracted")
-                return []
+            if len(transcription_result['segments']) > 20:
+                parts.append(f"... and {len(transcription_result['segments']) - 20} more segments\n")
         
-        except subprocess.CalledProcessError as e:
-            logger.warning(f"Frame extraction failed: {e.stderr.decode()}")
-            return []
-        except Exception as e:
-            logger.warning(f"Frame extraction failed: {e}")
-            return []
+        # Add video metadata if available
+        if video_metadata:
+            parts.append(f"\n\n## Video Metadata\n{_serialize_metadata(video_metadata)}")
+        else:
+            parts.append(f"\n\n## Video File\n{os.path.basename(video_path)}")
+        
+        # Add frame info if available
+        if frame_count:
+            parts.append(f"\n\n## Visual Information\nExtracted {frame_count} key frames from the video at 2-second intervals.")
+        
+        return ''.join(parts)
+    
+    def _clean_response(self, response_text):
+        """Strip whitespace and a surrounding markdown code block from a response"""
+        response_text = response_text.strip()
+        
+        # Log raw response for debugging (first 300 chars)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Raw response text (first 300 chars): %s", response_text[:300])
+        
+        # Remove markdown code blocks if present
+        # Handle both ```json and ``` formats
+        # (index slicing, no list-of-lines copy of the response)
+        if response_text.startswith('```'):
+            # Remove first line (``` or ```json)
+            first_newline = response_text.find('\n')
+            response_text = response_text[first_newline + 1:] if first_newline != -1 else ''
+            # Remove closing ``` if present (response_text is already stripped)
+            if response_text.endswith('```'):
+                response_text = response_text[:-3]
+            response_text = response_text.strip()
+            logger.debug("Stripped markdown code blocks from response")
+        
+        return response_text
+    
+    def _finalize_analysis(self, result, response_text, transcript_text, cache_path):
+        """Validate a parsed analysis, attach the transcript and cache it"""
+        # Validate result structure
+        if not isinstance(result, dict) or 'segments' not in result:
+            logger.warning("API response missing 'segments' key")
+            result = {'segments': [], 'overall_assessment': response_text}
+        
+        # Default missing scores once so ranking can use a plain itemgetter
+        for segment in result['segments']:
+            segment.setdefault('viral_score', 0)
+        
+        # Add transcript to result for reference
+        result['transcript'] = transcript_text
+        
+        # Save to cache
+        self._save_to_cache(cache_path, result)
+        
+        logger.info(f"Analysis complete: found {len(result.get('segments', []))} segments")
+        return result
+    
+    def _analyze_transcript(self, video_path, transcription_result, frame_count, cache_path,
+                            video_metadata=None):
+        """
+        Ask the AI for viral segments in one transcribed video
+        
+        Returns:
+            Dictionary containing analysis results with segments
+        """
+        # Step 3: Construct prompt with transcript
+        logger.info("Step 3/3: Analyzing transcript with AI...")
+        
+        transcript_text = self._truncate_transcript(transcription_result['text'].strip())
+        
+        # Build comprehensive prompt with transcript, then the instructions
+        prompt = ''.join((
+            self.prompts.get('video_analysis_prompt', ''),
+            self._build_video_context(
+                video_path, transcription_result, transcript_text, frame_count, video_metadata
+            ),
+            ANALYSIS_INSTRUCTIONS
+        ))
+        
+        # Validate prompt is not empty
+        if not prompt or len(prompt.strip()) < 100:
+            logger.error("Generated prompt is too short or empty")
+            return {
+                'segments': [],
+                'overall_assessment': 'Analysis failed: Invalid prompt generated',
+                'error': 'Invalid prompt'
+            }
+        
+        # Call API with the transcript-based prompt
+        response_text = self._clean_response(self._call_api(prompt))
+        
+        # Try to parse JSON
+        try:
+            result = _parse_llm_json(response_text)
+        except ValueError as e:
+            logger.error(f"Failed to parse API response as JSON: {e}")
+            logger.error(f"Response text after processing: {response_text[:500]}")
+            # Return a basic structure with error info
+            return {
+                'segments': [],
+                'overall_assessment': 'Analysis failed: Invalid JSON response from API',
+                'error': str(e),
+                'raw_response': response_text[:500]  # Include first 500 chars for debugging
+            }
+        
+        return self._finalize_analysis(result, response_text, transcript_text, cache_path)
     
     def analyze_video(self, video_path, video_metadata=None):
         """
@@ -414,192 +1044,208 @@ class VideoAnalyzer:
         if cached_result:
             return cached_result
         
+        # Expired but within the stale window: answer now, refresh in background
+        if self._stale_seconds:
+            stale_result = self._load_from_cache(cache_path, self._expiry_seconds + self._stale_seconds)
+            if stale_result:
+                logger.info(f"Serving stale analysis for {video_path} while refreshing")
+                self._refresh_in_background(video_path, cache_path, video_metadata)
+                return stale_result
+        
+        return self._analyze_uncached(video_path, cache_path, video_metadata)
+    
+    def _refresh_in_background(self, video_path, cache_path, video_metadata=None):
+        """Re-analyze a video on a daemon thread, at most once per cache entry"""
+        with self._refreshing_lock:
+            if cache_path in self._refreshing:
+                return
+            self._refreshing.add(cache_path)
+        
+        def refresh():
+            try:
+                self._analyze_uncached(video_path, cache_path, video_metadata)
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(cache_path)
+        
+        threading.Thread(target=refresh, name="analysis-refresh", daemon=True).start()
+    
+    def _analyze_uncached(self, video_path, cache_path, video_metadata=None):
+        """Transcribe and analyze a video, bypassing the cache lookup"""
         try:
-            # Step 1: Extract audio from video
-            logger.info("Step 1/4: Extracting audio from video...")
-            audio_path = self._extract_audio(video_path)
+            transcription_result, frame_count, error = self._transcribe_video(video_path)
+            if error:
+                return error
+            
+            return self._analyze_transcript(
+                video_path, transcription_result, frame_count, cache_path, video_metadata
+            )
+        
+        except Exception as e:
+            logger.error(f"Video analysis failed: {e}", exc_info=True)
+            return {
+                'segments': [],
+                'overall_assessment': f'Analysis failed: {str(e)}',
+                'error': str(e)
+            }
+    
+    def analyze_videos_batch(self, video_paths):
+        """
+        Analyze several videos with as few AI requests as possible
+        
+        Videos are transcribed as usual (extraction of the next video overlaps
+        transcription of the current one), then their transcripts are packed
+        into shared prompts up to the single-video transcript budget. Any
+        video the combined response does not cover is analyzed on its own.
+        
+        Args:
+            video_paths: List of video paths
             
-            if not audio_path:
-                logger.error("Failed to extract audio from video")
-                return {
+        Returns:
+            List of analysis results, in the same order as video_paths
+        """
+        results = [None] * len(video_paths)
+        pending = []
+        
+        for index, video_path in enumerate(video_paths):
+            if not os.path.exists(video_path):
+                logger.error(f"Video file not found: {video_path}")
+                results[index] = {
                     'segments': [],
-                    'overall_assessment': 'Analysis failed: Could not extract audio from video',
-                    'error': 'Audio extraction failed'
+                    'overall_assessment': 'Analysis failed: Video file not found',
+                    'error': 'File not found'
                 }
+                continue
             
-            # Step 2: Transcribe audio using Whisper
-            logger.info("Step 2/4: Transcribing audio with Whisper...")
-            transcription_result = self._transcribe_audio(audio_path)
-            
-            # Clean up audio file
+            cache_path = self._get_cache_path(video_path, 'video_analysis')
+            cached_result = self._load_from_cache(cache_path)
+            if cached_result:
+                results[index] = cached_result
+            else:
+                pending.append((index, video_path, cache_path))
+        
+        if not pending:
+            return results
+        
+        def transcribe(job):
             try:
-                if audio_path and os.path.exists(audio_path):
-                    os.remove(audio_path)
-                    logger.debug(f"Cleaned up temporary audio file: {audio_path}")
+                return self._transcribe_video(job[1])
             except Exception as e:
-                logger.warning(f"Failed to clean up audio file: {e}")
-            
-            if not transcription_result:
-                logger.error("Failed to transcribe audio")
-                return {
+                logger.error(f"Video analysis failed: {e}", exc_info=True)
+                return None, 0, {
                     'segments': [],
-                    'overall_assessment': 'Analysis failed: Could not transcribe audio',
-                    'error': 'Transcription failed'
+                    'overall_assessment': f'Analysis failed: {str(e)}',
+                    'error': str(e)
                 }
+        
+        # Group transcribed videos into prompts that fit the transcript budget
+        batches = []
+        batch, batch_chars = [], 0
+        with ThreadPoolExecutor(max_workers=min(len(pending), 4)) as executor:
+            for job, (transcription_result, frame_count, error) in zip(pending, executor.map(transcribe, pending)):
+                if error:
+                    results[job[0]] = error
+                    continue
+                
+                transcript_text = self._truncate_transcript(transcription_result['text'].strip())
+                if batch and batch_chars + len(transcript_text) > MAX_TRANSCRIPT_CHARS:
+                    batches.append(batch)
+                    batch, batch_chars = [], 0
+                batch.append((job, transcription_result, transcript_text, frame_count))
+                batch_chars += len(transcript_text)
+        if batch:
+            batches.append(batch)
+        
+        def analyze(batch):
+            analyzed = self._analyze_transcript_batch(batch) if len(batch) > 1 else {}
             
-            transcript_text = transcription_result.get('text', '').strip()
-            
-            if not transcript_text:
-                logger.error("Transcription returned empty text")
-                return {
-                    'segments': [],
-                    'overall_assessment': 'Analysis failed: Empty transcription',
-                    'error': 'Empty transcript'
-                }
-            
-            logger.info(f"Transcription successful: {len(transcript_text)} characters")
-            
-            # Step 3: Extract frames (optional, for future vision analysis)
-            logger.info("Step 3/4: Extracting key frames from video...")
-            frames = self._extract_frames(video_path, interval_seconds=2, max_frames=10)
-            
-            # Clean up frames (we're not using them yet, but they're available for future vision models)
-            for frame_path in frames:
+            for (index, video_path, cache_path), transcription_result, transcript_text, frame_count in batch:
+                if index in analyzed:
+                    results[index] = analyzed[index]
+                    continue
+                
+                # Not covered by a combined response: analyze this video alone
                 try:
-                    if os.path.exists(frame_path):
-                        os.remove(frame_path)
-                        logger.debug(f"Cleaned up frame: {frame_path}")
+                    results[index] = self._analyze_transcript(
+                        video_path, transcription_result, frame_count, cache_path
+                    )
                 except Exception as e:
-                    logger.warning(f"Failed to clean up frame: {e}")
-            
-            # Step 4: Construct prompt with transcript
-            logger.info("Step 4/4: Analyzing transcript with AI...")
-            
-            # Get analysis prompt
-            analysis_prompt = self.prompts.get('video_analysis_prompt', '')
-            
-            # Check transcript length and truncate if necessary
-            # GPT-4o has ~128k token context, but we'll be conservative
-            # Estimate ~4 chars per token, and leave room for prompt + response
-            max_transcript_chars = 50000  # ~12.5k tokens for transcript
-            
-            if len(transcript_text) > max_transcript_chars:
-                logger.warning(f"Transcript is very long ({len(transcript_text)} chars). Truncating to {max_transcript_chars} chars.")
-                # Keep first 75% and last 25% to preserve beginning and end
-                first_part_len = int(max_transcript_chars * 0.75)
-                last_part_len = max_transcript_chars - first_part_len
-                
-                transcript_text = (
-                    transcript_text[:first_part_len] + 
-                    "\n\n[... middle section truncated for length ...]\n\n" +
-                    transcript_text[-last_part_len:]
-                )
-                logger.info(f"Truncated transcript to {len(transcript_text)} chars")
-            
-            # Build comprehensive prompt with transcript
-            prompt = analysis_prompt
-            prompt += f"\n\n## Video Transcript\n\nThe following is the complete transcript of the video:\n\n\"\"\"\n{transcript_text}\n\"\"\"\n"
-            
-            # Add segment timing information if available
-            if 'segments' in transcription_result and transcription_result['segments']:
-                prompt += f"\n\n## Transcript Segments with Timestamps\n"
-                prompt += "The following segments show the exact timing of spoken content:\n\n"
-                for i, seg in enumerate(transcription_result['segments'][:20]):  # First 20 segments
-                    start = seg.get('start', 0)
-                    end = seg.get('end', 0)
-                    text = seg.get('text', '').strip()
-                    if text:
-                        prompt += f"[{start:.1f}s - {end:.1f}s]: {text}\n"
-                
-                if len(transcription_result['segments']) > 20:
-                    prompt += f"... and {len(transcription_result['segments']) - 20} more segments\n"
-            
-            # Add video metadata if available
-            if video_metadata:
-                prompt += f"\n\n## Video Metadata\n{json.dumps(video_metadata, indent=2)}"
-            else:
-                prompt += f"\n\n## Video File\n{os.path.basename(video_path)}"
-            
-            # Add frame info if available
-            if frames:
-                prompt += f"\n\n## Visual Information\nExtracted {len(frames)} key frames from the video at 2-second intervals."
-            
-            # Add instruction to analyze based on transcript
-            prompt += "\n\n## Instructions\nAnalyze the transcript above to identify viral-worthy segments. Focus on the spoken content, narrative flow, and emotional moments captured in the text. Identify segments that would work well as 15-60 second clips for social media."
-            
-            # Validate prompt is not empty
-            if not prompt or len(prompt.strip()) < 100:
-                logger.error("Generated prompt is too short or empty")
-                return {
-                    'segments': [],
-                    'overall_assessment': 'Analysis failed: Invalid prompt generated',
-                    'error': 'Invalid prompt'
-                }
-            
-            # Call API with the transcript-based prompt
-            response_text = self._call_api(prompt)
-            
-            # Parse JSON response
-            # Try to extract JSON from the response
-            response_text = response_text.strip()
-            
-            # Log raw response for debugging (first 300 chars)
-            logger.debug(f"Raw response text (first 300 chars): {response_text[:300]}")
-            
-            # Remove markdown code blocks if present
-            # Handle both ```json and ``` formats
-            if response_text.startswith('```'):
-                lines = response_text.split('\n')
-                # Remove first line (``` or ```json)
-                lines = lines[1:]
-                # Remove last line if it's just ```
-                if lines and lines[-1].strip() == '```':
-                    lines = lines[:-1]
-                response_text = '\n'.join(lines).strip()
-                logger.debug("Stripped markdown code blocks from response")
-            
-            # Try to parse JSON
-            try:
-                result = json.loads(response_text)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse API response as JSON: {e}")
-                logger.error(f"Response text after processing: {response_text[:500]}")
-                # Return a basic structure with error info
-                return {
-                    'segments': [],
-                    'overall_assessment': 'Analysis failed: Invalid JSON response from API',
-                    'error': str(e),
-                    'raw_response': response_text[:500]  # Include first 500 chars for debugging
-                }
-            
-            # Validate result structure
-            if 'segments' not in result:
-                logger.warning("API response missing 'segments' key")
-                result = {'segments': [], 'overall_assessment': response_text}
-            
-            # Add transcript to result for reference
-            result['transcript'] = transcript_text
-            
-            # Save to cache
-            self._save_to_cache(cache_path, result)
+                    logger.error(f"Video analysis failed: {e}", exc_info=True)
+                    results[index] = {
+                        'segments': [],
+                        'overall_assessment': f'Analysis failed: {str(e)}',
+                        'error': str(e)
+                    }
+        
+        # Independent prompts go out concurrently, capped by max_concurrency
+        with ThreadPoolExecutor(max_workers=min(len(batches), self.max_concurrency)) as executor:
+            list(executor.map(analyze, batches))
+        
+        return results
+    
+    def _analyze_transcript_batch(self, batch):
+        """
+        Analyze several transcribed videos with one AI request
+        
+        Args:
+            batch: List of ((index, video_path, cache_path), transcription result,
+                truncated transcript text, frame count) tuples
             
-            logger.info(f"Analysis complete: found {len(result.get('segments', []))} segments")
-            return result
+        Returns:
+            Dictionary mapping result index to analysis result, for the videos
+            the response covered (empty if the request or parsing failed)
+        """
+        logger.info(f"Analyzing {len(batch)} transcripts with one AI request...")
         
+        parts = [self.prompts.get('video_analysis_prompt', '')]
+        for number, ((_, video_path, _), transcription_result, transcript_text, frame_count) in enumerate(batch, 1):
+            parts.append(f"\n\n# Video {number}")
+            parts.append(self._build_video_context(video_path, transcription_result, transcript_text, frame_count))
+        
+        parts.append(
+            f"\n\n## Instructions\nAnalyze each of the {len(batch)} video transcripts above "
+            "independently to identify viral-worthy segments. Focus on the spoken content, "
+            "narrative flow, and emotional moments captured in the text. Identify segments that "
+            "would work well as 15-60 second clips for social media. Return a JSON object of the "
+            "form {\"videos\": [{\"video\": <video number>, ...}]} where each entry has the same "
+            "structure you would return for a single video."
+        )
+        prompt = ''.join(parts)
+        
+        try:
+            response_text = self._clean_response(self._call_api(prompt))
+            parsed = _parse_llm_json(response_text)
         except Exception as e:
-            logger.error(f"Video analysis failed: {e}", exc_info=True)
-            return {
-                'segments': [],
-                'overall_assessment': f'Analysis failed: {str(e)}',
-                'error': str(e)
-            }
+            logger.warning(f"Batched analysis failed, analyzing videos individually: {e}")
+            return {}
+        
+        entries = parsed.get('videos', []) if isinstance(parsed, dict) else parsed
+        if not isinstance(entries, list):
+            logger.warning("Batched analysis response has no video list, analyzing videos individually")
+            return {}
+        
+        analyzed = {}
+        for entry in entries:
+            if not isinstance(entry, dict) or 'segments' not in entry:
+                continue
+            number = entry.pop('video', None)
+            if not isinstance(number, int) or not 1 <= number <= len(batch):
+                continue
+            (index, video_path, cache_path), _, transcript_text, _ = batch[number - 1]
+            try:
+                analyzed[index] = self._finalize_analysis(entry, response_text, transcript_text, cache_path)
+            except (AttributeError, TypeError) as e:
+                # Malformed segments; leave this video to the individual analysis
+                logger.warning(f"Batched analysis entry for {video_path} is malformed: {e}")
+        
+        return analyzed
     
     def filter_segments(self, segments, min_score=70):
         """
         Filter segments by viral score
         
         Args:
-            segments: List of segment dictionaries
+            segments: List of segment dictionaries from analyze_video
             min_score: Minimum viral score threshold
             
         Returns:
@@ -614,7 +1260,7 @@ class VideoAnalyzer:
         Rank segments by viral score
         
         Args:
-            segments: List of segment dictionaries
+            segments: List of segment dictionaries from analyze_video
             
         Returns:
             Sorted list of segments (highest score first)
@@ -636,13 +1282,34 @@ class VideoAnalyzer:
         """
         # Analyze video
         analysis = self.analyze_video(video_path)
+        return self._select_best_segments(analysis, min_score, max_segments)
+    
+    def get_best_segments_batch(self, video_paths, min_score=70, max_segments=5):
+        """
+        Analyze several videos with batched AI requests and return each one's best segments
         
-        # Get segments
+        Args:
+            video_paths: List of video paths
+            min_score: Minimum viral score
+            max_segments: Maximum number of segments to return per video
+            
+        Returns:
+            List of top-segment lists, in the same order as video_paths
+        """
+        return [
+            self._select_best_segments(analysis, min_score, max_segments)
+            for analysis in self.analyze_videos_batch(video_paths)
+        ]
+    
+    def _select_best_segments(self, analysis, min_score, max_segments):
+        """Filter an analysis' segments by score and keep the top ones"""
         segments = analysis.get('segments', [])
         
-        # Filter and rank
-        filtered = self.filter_segments(segments, min_score)
-        ranked = self.rank_segments(filtered)
-        
-        # Return top segments
-        return ranked[:max_segments]
+        # Filter and take the top segments in one pass (no full sort)
+        best = heapq.nlargest(
+            max_segments,
+            (s for s in segments if _score(s) >= min_score),
+            key=_score
+        )
+        logger.info(f"Selected {len(best)} of {len(segments)} segments (min_score={min_score})")
+        return best
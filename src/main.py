@@ -4,28 +4,58 @@ Main orchestrator for autonomous video clipping and publishing system
 import os
 import sys
 import argparse
+import atexit
+import copy
+import hashlib
+import importlib
 import logging
+import logging.handlers
+import multiprocessing
+import queue
+import shutil
+import signal
+import tempfile
+import threading
 import yaml
-from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import lru_cache
+
+# Prefer the libyaml C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 # Add src to path
 sys.path.insert(0, os.path.dirname(__file__))
 
 from utils.credential_manager import CredentialManager
 from utils.state_manager import StateManager
-from utils.browser_manager import BrowserManager
-from core.video_analyzer import VideoAnalyzer
-from core.clip_extractor import ClipExtractor
-from core.format_optimizer import FormatOptimizer
-from core.metadata_generator import MetadataGenerator
-from upload.instagram_uploader import InstagramUploader
-from upload.youtube_uploader import YouTubeUploader
-from upload.tiktok_uploader import TikTokUploader
-from upload.upload_scheduler import UploadScheduler
-
-
-def setup_logging(config):
-    """Setup logging configuration"""
+
+
+# Listener thread that writes queued log records to the real handlers
+_log_listener = None
+
+
+def setup_logging(config, force=False):
+    """
+    Setup logging configuration
+    
+    Records are queued and written by a listener thread, so threads that log
+    never block on console or file I/O.
+    
+    Args:
+        config: Settings dictionary
+        force: Replace existing root handlers (used by forked worker processes,
+            which inherit a queue that no listener drains)
+    """
+    global _log_listener
+    root = logging.getLogger()
+    if root.handlers and not force:
+        return
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    
     log_config = config.get('logging', {})
     log_level = getattr(logging, log_config.get('level', 'INFO'))
     log_format = log_config.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -42,215 +72,749 @@ def setup_logging(config):
         log_file = os.path.join(log_dir, 'app.log')
         handlers.append(logging.FileHandler(log_file))
     
-    logging.basicConfig(
-        level=log_level,
-        format=log_format,
-        handlers=handlers
-    )
+    formatter = logging.Formatter(log_format)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.Queue(-1)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(log_level)
+    
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
 
 
-def load_config():
-    """Load configuration files"""
-    with open('config/settings.yaml', 'r') as f:
-        settings = yaml.safe_load(f)
+# Platforms processed when none are given (a tuple, so it is shared safely
+# and usable in cache keys)
+DEFAULT_PLATFORMS = ('instagram', 'youtube', 'tiktok')
+
+# Extensions picked up from the input directory (lowercase, for str.endswith)
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv')
+
+# Most clip metadata entries kept in cache_ai/metadata.json (oldest dropped first)
+METADATA_CACHE_MAX_ENTRIES = 1000
+
+# Uploader class for each platform as (module, class name). Imported on first
+# use, so runs that never upload skip loading selenium and the browser stack.
+UPLOADER_CLASSES = {
+    'instagram': ('upload.instagram_uploader', 'InstagramUploader'),
+    'youtube': ('upload.youtube_uploader', 'YouTubeUploader'),
+    'tiktok': ('upload.tiktok_uploader', 'TikTokUploader'),
+}
+
+CONFIG_FILES = ('config/settings.yaml', 'config/ai_prompts.yaml')
+
+
+def _config_signature():
+    """(mtime_ns, size) of each configuration file, so edits invalidate the cache"""
+    signature = []
+    for path in CONFIG_FILES:
+        stat = os.stat(path)
+        signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+@lru_cache(maxsize=1)
+def _load_config_cached(signature):
+    """Load configuration for a given file signature"""
+    with open(CONFIG_FILES[0], 'r') as f:
+        settings = yaml.load(f, Loader=SafeLoader)
     
-    with open('config/ai_prompts.yaml', 'r') as f:
-        prompts = yaml.safe_load(f)
+    with open(CONFIG_FILES[1], 'r') as f:
+        prompts = yaml.load(f, Loader=SafeLoader)
     
     return settings, prompts
 
 
-class VideoClippingSystem:
-    """Main system orchestrator"""
+def load_config():
+    """Load configuration files (parsed once per change to the YAML files)"""
+    # Callers mutate config sections, so hand out a copy of the cached dicts
+    return copy.deepcopy(_load_config_cached(_config_signature()))
+
+
+class VideoPipeline:
+    """
+    Analysis, extraction and optimization components for processing videos
+
+    Holds no uploaders or browser state, so each worker process can build its own.
+    """
     
-    def __init__(self):
-        """Initialize the system"""
-        # Load configurations
-        self.settings, self.prompts = load_config()
+    def __init__(self, settings, prompts, credential_manager):
+        """Initialize the processing components"""
+        # Imported here so CLI commands that never process video skip them
+        from core.video_analyzer import VideoAnalyzer
+        from core.clip_extractor import ClipExtractor
+        from core.format_optimizer import FormatOptimizer
+        from core.metadata_generator import MetadataGenerator
         
-        # Setup logging
-        setup_logging(self.settings)
+        self.settings = settings
         self.logger = logging.getLogger(__name__)
         
-        # Initialize managers
-        self.credential_manager = CredentialManager()
-        self.state_manager = StateManager(self.settings['paths']['state_files'])
-        self.browser_manager = BrowserManager(self.settings['browser'])
-        
         # Initialize AI configuration with cache directory
-        ai_config = self.settings['ai'].copy()
-        ai_config['cache_dir'] = self.settings['paths']['cache_ai']
+        ai_config = settings['ai'].copy()
+        ai_config['cache_dir'] = settings['paths']['cache_ai']
         
-        # Initialize core components
         self.video_analyzer = VideoAnalyzer(
             ai_config, 
-            self.prompts, 
-            self.credential_manager
+            prompts, 
+            credential_manager
         )
-        self.clip_extractor = ClipExtractor(self.settings['video'])
+        self.clip_extractor = ClipExtractor(settings['video'])
         self.format_optimizer = FormatOptimizer(
-            self.settings['video'], 
-            self.settings['platforms']
+            settings['video'], 
+            settings['platforms']
         )
         self.metadata_generator = MetadataGenerator(
-            self.settings['metadata'], 
-            self.prompts, 
+            settings['metadata'], 
+            prompts, 
             self.video_analyzer
         )
         
-        # Initialize upload components
-        self.instagram_uploader = InstagramUploader(
-            self.browser_manager, 
-            self.credential_manager
-        )
-        self.youtube_uploader = YouTubeUploader(
-            self.browser_manager, 
-            self.credential_manager
-        )
-        self.tiktok_uploader = TikTokUploader(
-            self.browser_manager, 
-            self.credential_manager
-        )
+        # Generated metadata keyed by clip content, platforms and metadata
+        # settings, persisted so re-runs skip the AI round-trip. Only the
+        # parent process writes the file; workers hand their new entries back.
+        self._metadata_cache_path = os.path.join(settings['paths']['cache_ai'], 'metadata.json')
+        self._metadata_settings_key = hashlib.sha1(
+            repr(sorted(settings['metadata'].items())).encode()
+        ).hexdigest()[:12]
+        self._metadata_cache = self._load_metadata_cache()
+        self._metadata_new = {}
+        self.persist_metadata = True
         
-        # Initialize scheduler
-        self.upload_scheduler = UploadScheduler(
-            self.settings['scheduling'], 
-            self.state_manager
-        )
+        # Optimized outputs keyed by clip content, platform and encode settings,
+        # so unchanged clips are never re-encoded
+        self._optimized_cache_dir = os.path.join(settings['paths']['cache_ai'], 'optimized')
+        self._optimizer_settings_key = hashlib.sha1(
+            repr((sorted(settings['video'].items()), sorted(settings['platforms'].items()))).encode()
+        ).hexdigest()[:12]
+        self._clip_digests = {}
+        self._optimized_cache_max_bytes = (
+            settings['video'].get('optimized_cache_max_mb', 2048) or 0
+        ) * 1024 * 1024
         
-        self.logger.info("Video Clipping System initialized")
+        # Threads per FFmpeg process; set in worker processes so N parallel
+        # videos don't each start a thread per core
+        self.ffmpeg_threads = None
     
-    def discover_videos(self):
-        """Discover video files in input directory"""
-        input_dir = self.settings['paths']['input_videos']
-        video_extensions = ['.mp4', '.mov', '.avi', '.mkv']
+    def _load_metadata_cache(self):
+        """Load persisted clip metadata, or start empty"""
+        from core.video_analyzer import _json_loads
+        
+        try:
+            with open(self._metadata_cache_path, 'rb') as f:
+                cache = _json_loads(f.read())
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+    
+    def _save_metadata_cache(self):
+        """Persist the metadata cache if it has new entries (parent process only)"""
+        from core.video_analyzer import _json_dumps
         
-        videos = []
-        for ext in video_extensions:
-            videos.extend(Path(input_dir).glob(f'*{ext}'))
+        if not self._metadata_new or not self.persist_metadata:
+            return
         
-        self.logger.info(f"Discovered {len(videos)} videos in {input_dir}")
-        return [str(v) for v in videos]
+        # Entries are kept in least-recently-used order, so drop from the front
+        cache = self._metadata_cache
+        while len(cache) > METADATA_CACHE_MAX_ENTRIES:
+            del cache[next(iter(cache))]
+        
+        try:
+            os.makedirs(os.path.dirname(self._metadata_cache_path) or '.', exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self._metadata_cache_path) or '.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(_json_dumps(cache))
+                os.replace(tmp_path, self._metadata_cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            self.logger.warning(f"Could not save metadata cache: {e}")
+            return
+        
+        self._metadata_new = {}
     
-    def process_video(self, video_path, platforms=None, auto_upload=False):
+    def take_new_metadata(self):
+        """Return the metadata entries generated since the last call, and forget them"""
+        new_metadata, self._metadata_new = self._metadata_new, {}
+        return new_metadata
+    
+    def add_metadata(self, entries):
         """
-        Process a single video: analyze, extract clips, optimize, and schedule uploads
+        Merge metadata entries generated by a worker process and persist them
+        
+        Args:
+            entries: Entries returned by the worker pipeline's take_new_metadata
+        """
+        self._metadata_cache.update(entries)
+        self._metadata_new.update(entries)
+        self._save_metadata_cache()
+    
+    def _clip_digest(self, clip_path):
+        """Content hash of a clip, recomputed only when its size or mtime changes"""
+        stat = os.stat(clip_path)
+        identity = (clip_path, stat.st_mtime_ns, stat.st_size)
+        digest = self._clip_digests.get(identity)
+        if digest is None:
+            sha1 = hashlib.sha1()
+            with open(clip_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    sha1.update(chunk)
+            digest = self._clip_digests[identity] = sha1.hexdigest()[:16]
+        return digest
+    
+    def _optimize_clip(self, clip_path, platforms, threads=None):
+        """
+        Optimize a clip for several platforms, reusing earlier outputs for identical content
+        
+        Outputs are written next to the clip as <name>_<platform>_optimized.mp4,
+        with a hard link (or copy) kept in the optimized cache. Platforms without
+        a cached output are encoded together in one FFmpeg pass, so the clip is
+        decoded once.
+        
+        Args:
+            clip_path: Path to the clip
+            platforms: Platforms to optimize for
+            threads: FFmpeg threads for the encode (default: ffmpeg_threads)
+        
+        Returns:
+            Dictionary mapping each platform to its optimized path (or None if failed)
+        """
+        threads = threads or self.ffmpeg_threads
+        output_dir = os.path.dirname(clip_path)
+        try:
+            digest = self._clip_digest(clip_path)
+        except OSError:
+            return self.format_optimizer.optimize_for_platforms(
+                clip_path, platforms, output_dir=output_dir, threads=threads
+            )
+        
+        clip_name = os.path.splitext(os.path.basename(clip_path))[0]
+        optimized = {}
+        cached_paths = {}
+        for platform in platforms:
+            cached_path = os.path.join(
+                self._optimized_cache_dir,
+                f"{digest}_{platform}_{self._optimizer_settings_key}.mp4"
+            )
+            if os.path.exists(cached_path):
+                self.logger.info(f"Reusing optimized {platform} output for {clip_path}")
+                output_path = os.path.join(output_dir, f"{clip_name}_{platform}_optimized.mp4")
+                self._link_or_copy(cached_path, output_path)
+                # Mark as recently used for _prune_optimized_cache
+                os.utime(cached_path)
+                optimized[platform] = output_path
+            else:
+                cached_paths[platform] = cached_path
+        
+        if not cached_paths:
+            return optimized
+        
+        # Encode into a private directory, then move into place so a partial
+        # output is never mistaken for a cached one
+        os.makedirs(self._optimized_cache_dir, exist_ok=True)
+        work_dir = tempfile.mkdtemp(dir=self._optimized_cache_dir)
+        try:
+            encoded = self.format_optimizer.optimize_for_platforms(
+                clip_path, list(cached_paths), output_dir=work_dir, threads=threads
+            )
+            for platform, encoded_path in encoded.items():
+                if encoded_path is None:
+                    optimized[platform] = None
+                    continue
+                output_path = os.path.join(output_dir, os.path.basename(encoded_path))
+                os.replace(encoded_path, cached_paths[platform])
+                self._link_or_copy(cached_paths[platform], output_path)
+                optimized[platform] = output_path
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        
+        self._prune_optimized_cache()
+        return optimized
+    
+    def optimize_clips(self, clips, platforms):
+        """
+        Generate metadata and optimized outputs for extracted clips, encoding clips in parallel
+        
+        Each clip is encoded for all platforms in one FFmpeg pass, with the
+        cores split between the clips being encoded at once. Metadata for a
+        clip is generated (or read from cache) while the encodes run.
+        
+        Args:
+            clips: Clip dictionaries returned by extract_clips
+            platforms: Platforms to optimize for
+            
+        Returns:
+            List of (clip_info, metadata, optimized) tuples in clip order, where
+            optimized maps each platform to its optimized path (or None if failed)
+        """
+        if not clips:
+            return []
+        
+        workers = min(self.clip_extractor.max_parallel_clips, len(clips))
+        threads = self.clip_extractor.threads_per_invocation(workers)
+        if self.ffmpeg_threads:
+            threads = min(threads or self.ffmpeg_threads, self.ffmpeg_threads)
+        
+        results = []
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self._optimize_clip, clip_info['path'], platforms, threads)
+                    for clip_info in clips
+                ]
+                try:
+                    for clip_info, future in zip(clips, futures):
+                        metadata = self._get_clip_metadata(clip_info, platforms)
+                        results.append((clip_info, metadata, future.result()))
+                except BaseException:
+                    # Don't start encodes nobody will use
+                    for future in futures:
+                        future.cancel()
+                    raise
+            return results
+        finally:
+            self._save_metadata_cache()
+    
+    @staticmethod
+    def _link_or_copy(src, dst):
+        """Place src at dst as a hard link, or a copy across filesystems"""
+        # Replace rather than overwrite, so an existing dst that shares the
+        # cached file's inode is never written into
+        tmp_path = f"{dst}.{os.getpid()}.tmp"
+        try:
+            os.link(src, tmp_path)
+        except OSError:
+            shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+    
+    def _prune_optimized_cache(self):
+        """Delete the least recently used optimized outputs beyond the size limit"""
+        if not self._optimized_cache_max_bytes:
+            return
+        
+        entries = []
+        try:
+            with os.scandir(self._optimized_cache_dir) as it:
+                for entry in it:
+                    # Skip the work directories of encodes in progress
+                    if entry.name.endswith('.mp4') and entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            return
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self._optimized_cache_max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+    
+    def _get_clip_metadata(self, clip_info, platforms):
+        """Generate metadata for a clip, reusing earlier results for the same clip content"""
+        try:
+            digest = self._clip_digest(clip_info['path'])
+        except OSError:
+            return self.metadata_generator.generate_metadata_for_clip(clip_info, platforms)
+        
+        # Re-extracted clips get a new mtime but the same content, so the key
+        # survives across runs (a string, so the cache stores as JSON)
+        key = f"{digest}:{','.join(sorted(platforms))}:{self._metadata_settings_key}"
+        metadata = self._metadata_cache.pop(key, None)
+        if metadata is None:
+            metadata = self.metadata_generator.generate_metadata_for_clip(clip_info, platforms)
+            self._metadata_new[key] = metadata
+        # (Re)insert at the end to mark the entry as recently used
+        self._metadata_cache[key] = metadata
+        return metadata
+    
+    def process(self, video_path, platforms=None):
+        """
+        Analyze, extract clips and optimize them for each platform
         
         Args:
             video_path: Path to video file
-            platforms: List of platforms to upload to (default: all)
-            auto_upload: Whether to automatically schedule uploads
+            platforms: List of platforms to optimize for (default: all)
             
         Returns:
-            Dictionary with processing results
+            Tuple of (results dictionary, list of optimized outputs ready for upload)
         """
-        if platforms is None:
-            platforms = ['instagram', 'youtube', 'tiktok']
+        try:
+            segments = self.find_segments(video_path)
+        except Exception as e:
+            self.logger.error(f"Error processing video: {e}", exc_info=True)
+            return {'video_path': video_path, 'clips': [], 'scheduled_uploads': []}, []
         
+        return self.process_segments(video_path, segments, platforms)
+    
+    def find_segments(self, video_path):
+        """Step 1: analyze a video and return its best viral segments"""
         self.logger.info(f"Processing video: {video_path}")
+        self.logger.info("Step 1: Analyzing video...")
+        return self.video_analyzer.get_best_segments(
+            video_path,
+            min_score=70,
+            max_segments=5
+        )
+    
+    def find_segments_batch(self, video_paths):
+        """Step 1 for several videos: transcripts share AI requests where they fit"""
+        self.logger.info(f"Step 1: Analyzing {len(video_paths)} videos...")
+        return self.video_analyzer.get_best_segments_batch(
+            video_paths,
+            min_score=70,
+            max_segments=5
+        )
+    
+    def process_segments(self, video_path, segments, platforms=None):
+        """
+        Extract clips for analyzed segments and optimize them for each platform
+        
+        Args:
+            video_path: Path to video file
+            segments: Segments returned by find_segments
+            platforms: List of platforms to optimize for (default: all)
+            
+        Returns:
+            Tuple of (results dictionary, list of optimized outputs ready for upload)
+        """
+        if platforms is None:
+            platforms = DEFAULT_PLATFORMS
         
         results = {
             'video_path': video_path,
             'clips': [],
             'scheduled_uploads': []
         }
+        outputs = []
         
         try:
-            # Step 1: Analyze video
-            self.logger.info("Step 1: Analyzing video...")
-            segments = self.video_analyzer.get_best_segments(
-                video_path,
-                min_score=70,
-                max_segments=5
-            )
-            
             if not segments:
                 self.logger.warning("No viral segments found in video")
-                return results
+                return results, outputs
             
             self.logger.info(f"Found {len(segments)} viral segments")
             
             # Step 2: Extract clips
             self.logger.info("Step 2: Extracting clips...")
             output_dir = self.settings['paths']['output_clips']
-            clips = self.clip_extractor.extract_clips(video_path, segments, output_dir)
+            clips = self.clip_extractor.extract_clips(
+                video_path, segments, output_dir, max_threads=self.ffmpeg_threads
+            )
             
             if not clips:
                 self.logger.warning("No clips extracted")
-                return results
+                return results, outputs
             
             results['clips'] = clips
             
             # Step 3: Optimize and generate metadata for each platform
             self.logger.info("Step 3: Optimizing clips and generating metadata...")
-            for clip_info in clips:
-                clip_path = clip_info['path']
-                
-                # Generate metadata for all platforms
-                metadata = self.metadata_generator.generate_metadata_for_clip(
-                    clip_info, 
-                    platforms
-                )
-                
-                # Optimize for each platform
+            for clip_info, metadata, optimized in self.optimize_clips(clips, platforms):
                 for platform in platforms:
-                    optimized_path = self.format_optimizer.optimize_for_platform(
-                        clip_path, 
-                        platform
-                    )
-                    
-                    if optimized_path and auto_upload:
-                        # Create upload task
-                        upload_task = {
+                    optimized_path = optimized.get(platform)
+                    if optimized_path:
+                        outputs.append({
                             'video_path': video_path,
                             'clip_path': optimized_path,
                             'platform': platform,
                             'metadata': metadata.get(platform, {})
-                        }
-                        
-                        # Schedule upload
-                        upload_function = self._get_upload_function(platform)
-                        if upload_function:
-                            job_id = self.upload_scheduler.schedule_upload(
-                                upload_task, 
-                                upload_function
-                            )
-                            results['scheduled_uploads'].append({
-                                'job_id': job_id,
-                                'platform': platform,
-                                'clip_path': optimized_path
-                            })
+                        })
             
-            self.logger.info(f"Processing complete: {len(clips)} clips, {len(results['scheduled_uploads'])} uploads scheduled")
-            return results
+            return results, outputs
         
         except Exception as e:
             self.logger.error(f"Error processing video: {e}", exc_info=True)
-            return results
+            return results, outputs
+        
+        finally:
+            self._save_metadata_cache()
+
+
+# Pipeline owned by the current worker process (built once by _init_worker)
+_worker_pipeline = None
+
+
+def _init_worker(settings, prompts, ffmpeg_threads=None, max_hw_encodes=None):
+    """Build the processing pipeline once when a worker process starts"""
+    global _worker_pipeline
+    setup_logging(settings, force=True)
+    _worker_pipeline = VideoPipeline(settings, prompts, CredentialManager())
+    _worker_pipeline.ffmpeg_threads = ffmpeg_threads
+    if max_hw_encodes:
+        # This worker's share of the NVENC sessions
+        _worker_pipeline.clip_extractor.max_parallel_hw_encodes = max_hw_encodes
+    # The parent saves metadata the workers generate, so the file has one writer
+    _worker_pipeline.persist_metadata = False
+
+
+def _worker(video_path, segments, platforms):
+    """
+    Extract and optimize an analyzed video's clips inside a worker process
+    
+    Returns:
+        Tuple of (results dictionary, optimized outputs, new metadata cache entries)
+    """
+    results, outputs = _worker_pipeline.process_segments(video_path, segments, platforms)
+    return results, outputs, _worker_pipeline.take_new_metadata()
+
+
+class VideoClippingSystem:
+    """Main system orchestrator"""
+    
+    def __init__(self):
+        """Initialize the system"""
+        # Load configurations
+        self.settings, self.prompts = load_config()
+        
+        # Setup logging
+        setup_logging(self.settings)
+        self.logger = logging.getLogger(__name__)
+        
+        # Initialize managers
+        self.credential_manager = CredentialManager()
+        self.state_manager = StateManager(self.settings['paths']['state_files'])
+        self._browser_manager = None
+        
+        # Initialize core components
+        self.pipeline = VideoPipeline(self.settings, self.prompts, self.credential_manager)
+        self.video_analyzer = self.pipeline.video_analyzer
+        self.clip_extractor = self.pipeline.clip_extractor
+        self.format_optimizer = self.pipeline.format_optimizer
+        self.metadata_generator = self.pipeline.metadata_generator
+        
+        # Videos processed in parallel worker processes by process_all_videos
+        self.max_parallel_videos = (
+            self.settings['video'].get('max_parallel_videos') or os.cpu_count() or 1
+        )
+        
+        # Upload components are created when a platform is first uploaded to;
+        # their bound upload functions are kept as the dispatch table
+        self._uploaders = {}
+        self._upload_functions = {}
+        
+        # Initialize scheduler
+        from upload.upload_scheduler import UploadScheduler
+        self.upload_scheduler = UploadScheduler(
+            self.settings['scheduling'], 
+            self.state_manager
+        )
+        
+        self.logger.info("Video Clipping System initialized")
+    
+    def discover_videos(self):
+        """Discover video files in input directory"""
+        input_dir = self.settings['paths']['input_videos']
+        
+        # One directory pass instead of a glob per extension, keeping plain
+        # strings throughout
+        try:
+            with os.scandir(input_dir) as entries:
+                videos = [
+                    entry.path for entry in entries
+                    if entry.name.lower().endswith(VIDEO_EXTENSIONS) and entry.is_file()
+                ]
+        except FileNotFoundError:
+            videos = []
+        
+        self.logger.info(f"Discovered {len(videos)} videos in {input_dir}")
+        return videos
+    
+    def process_video(self, video_path, platforms=None, auto_upload=False):
+        """
+        Process a single video: analyze, extract clips, optimize, and schedule uploads
+        
+        Args:
+            video_path: Path to video file
+            platforms: List of platforms to upload to (default: all)
+            auto_upload: Whether to automatically schedule uploads
+            
+        Returns:
+            Dictionary with processing results
+        """
+        results, outputs = self.pipeline.process(video_path, platforms)
+        self._schedule_uploads(results, outputs, auto_upload)
+        return results
+    
+    def _schedule_uploads(self, results, outputs, auto_upload):
+        """Schedule uploads for optimized clips and log the processing summary"""
+        if auto_upload:
+            for upload_task in outputs:
+                platform = upload_task['platform']
+                
+                # Schedule upload
+                upload_function = self._get_upload_function(platform)
+                if upload_function:
+                    job_id = self.upload_scheduler.schedule_upload(
+                        upload_task, 
+                        upload_function
+                    )
+                    results['scheduled_uploads'].append({
+                        'job_id': job_id,
+                        'platform': platform,
+                        'clip_path': upload_task['clip_path']
+                    })
+        
+        if results['clips']:
+            self.logger.info(f"Processing complete: {len(results['clips'])} clips, {len(results['scheduled_uploads'])} uploads scheduled")
+    
+    @property
+    def browser_manager(self):
+        """Browser manager shared by the uploaders (created on first use)"""
+        if self._browser_manager is None:
+            from utils.browser_manager import BrowserManager
+            self._browser_manager = BrowserManager(self.settings['browser'])
+        return self._browser_manager
+    
+    def _get_uploader(self, platform):
+        """Get the uploader for a platform, importing and creating it on first use"""
+        uploader = self._uploaders.get(platform)
+        if uploader is None and platform in UPLOADER_CLASSES:
+            module_name, class_name = UPLOADER_CLASSES[platform]
+            uploader_class = getattr(importlib.import_module(module_name), class_name)
+            uploader = self._uploaders[platform] = uploader_class(
+                self.browser_manager, 
+                self.credential_manager
+            )
+        return uploader
     
     def _get_upload_function(self, platform):
         """Get upload function for platform"""
-        uploaders = {
-            'instagram': self.instagram_uploader.upload,
-            'youtube': self.youtube_uploader.upload,
-            'tiktok': self.tiktok_uploader.upload
-        }
-        return uploaders.get(platform)
+        upload_function = self._upload_functions.get(platform)
+        if upload_function is None:
+            uploader = self._get_uploader(platform)
+            if uploader is None:
+                return None
+            upload_function = self._upload_functions[platform] = uploader.upload
+        return upload_function
     
     def process_all_videos(self, platforms=None, auto_upload=False):
-        """Process all videos in input directory"""
+        """
+        Process all videos in input directory
+        
+        Yields each video's results dictionary as soon as it is done, so
+        callers can report progress without holding every result.
+        """
         videos = self.discover_videos()
         
         if not videos:
             self.logger.warning("No videos found to process")
-            return []
+            return
         
-        results = []
-        for video_path in videos:
-            result = self.process_video(video_path, platforms, auto_upload)
-            results.append(result)
+        workers = min(self.max_parallel_videos, len(videos))
+        # Each worker encodes, so NVENC's session limit bounds the workers too
+        hw_limit = self.clip_extractor.max_parallel_hw_encodes
+        max_hw_encodes = None
+        if hw_limit and self.clip_extractor._detect_hw_encoder():
+            workers = min(workers, hw_limit)
+            # Workers encode several clips at once, so split the sessions
+            # between them rather than giving each the full limit
+            max_hw_encodes = max(1, hw_limit // workers)
+        if workers <= 1:
+            yield from self._process_videos_pipelined(videos, platforms, auto_upload)
+            return
         
-        return results
+        # Analysis runs here, one group of videos at a time, against a single
+        # Whisper model warmed once in this process; each group's transcripts
+        # share AI requests. Each analyzed video's clips are extracted and
+        # optimized in a worker process. Uploads are scheduled here once a
+        # video's results come back.
+        self.logger.info(f"Processing {len(videos)} videos with {workers} worker processes")
+        self.video_analyzer.warmup()
+        
+        # Split the cores between the workers' FFmpeg processes
+        ffmpeg_threads = self.clip_extractor.threads_per_invocation(workers)
+        # Spawn rather than fork: this process holds the Whisper model, the
+        # logging listener thread and thread pools, none of which survive a
+        # fork safely. _init_worker builds everything a worker needs.
+        with ThreadPoolExecutor(max_workers=1) as ai_pool, ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(self.settings, self.prompts, ffmpeg_threads, max_hw_encodes),
+            mp_context=multiprocessing.get_context('spawn')
+        ) as executor:
+            # One group per round of workers, so clip work starts after the
+            # first group instead of after every video has been analyzed
+            pending = {
+                ai_pool.submit(self.pipeline.find_segments_batch, group): ('analyze', group)
+                for group in (videos[i:i + workers] for i in range(0, len(videos), workers))
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, item = pending.pop(future)
+                    if stage == 'analyze':
+                        try:
+                            group_segments = future.result()
+                        except Exception as e:
+                            self.logger.error(f"Error analyzing videos {item}: {e}", exc_info=True)
+                            for video_path in item:
+                                yield {'video_path': video_path, 'clips': [], 'scheduled_uploads': []}
+                            continue
+                        for video_path, segments in zip(item, group_segments):
+                            pending[executor.submit(_worker, video_path, segments, platforms)] = ('clips', video_path)
+                        continue
+                    
+                    video_path = item
+                    try:
+                        result, outputs, new_metadata = future.result()
+                        self.pipeline.add_metadata(new_metadata)
+                    except Exception as e:
+                        self.logger.error(f"Error processing video {video_path}: {e}", exc_info=True)
+                        result = {'video_path': video_path, 'clips': [], 'scheduled_uploads': []}
+                        outputs = []
+                    self._schedule_uploads(result, outputs, auto_upload)
+                    yield result
+    
+    def _process_videos_pipelined(self, videos, platforms, auto_upload):
+        """
+        Process videos in this process as a two-stage pipeline
+        
+        Analysis (transcription and AI) runs on its own thread, one video at a
+        time, while the previous video's clips are extracted and optimized, so
+        the GPU/API stage and the ffmpeg stage overlap. Results are yielded in
+        input order.
+        """
+        if len(videos) == 1:
+            yield self.process_video(videos[0], platforms, auto_upload)
+            return
+        
+        def finish(video_path, future):
+            if future is None:
+                return {'video_path': video_path, 'clips': [], 'scheduled_uploads': []}
+            result, outputs = future.result()
+            self._schedule_uploads(result, outputs, auto_upload)
+            return result
+        
+        with ThreadPoolExecutor(max_workers=1) as ai_pool, ThreadPoolExecutor(max_workers=1) as ffmpeg_pool:
+            segment_futures = [
+                (video_path, ai_pool.submit(self.pipeline.find_segments, video_path))
+                for video_path in videos
+            ]
+            
+            previous = None
+            for video_path, segment_future in segment_futures:
+                try:
+                    segments = segment_future.result()
+                    current = (video_path, ffmpeg_pool.submit(
+                        self.pipeline.process_segments, video_path, segments, platforms
+                    ))
+                except Exception as e:
+                    self.logger.error(f"Error processing video {video_path}: {e}", exc_info=True)
+                    current = (video_path, None)
+                
+                # The previous video finishes encoding while this one was analyzed
+                if previous is not None:
+                    yield finish(*previous)
+                previous = current
+            
+            if previous is not None:
+                yield finish(*previous)
     
     def start_scheduler(self):
         """Start the upload scheduler"""
@@ -275,7 +839,7 @@ def main():
     process_parser = subparsers.add_parser('process', help='Process videos')
     process_parser.add_argument('--video', help='Specific video file to process')
     process_parser.add_argument('--platforms', nargs='+', 
-                              choices=['instagram', 'youtube', 'tiktok'],
+                              choices=DEFAULT_PLATFORMS,
                               help='Platforms to upload to')
     process_parser.add_argument('--auto-upload', action='store_true',
                               help='Automatically schedule uploads')
@@ -298,10 +862,14 @@ def main():
     
     args = parser.parse_args()
     
-    # Initialize system
-    system = VideoClippingSystem()
+    if args.command is None:
+        parser.print_help()
+        return
     
     if args.command == 'process':
+        # Initialize system
+        system = VideoClippingSystem()
+        
         # Start scheduler
         system.start_scheduler()
         
@@ -317,28 +885,48 @@ def main():
                 print(f"Clips extracted: {len(result['clips'])}")
                 print(f"Uploads scheduled: {len(result['scheduled_uploads'])}")
             else:
-                # Process all videos
-                results = system.process_all_videos(args.platforms, args.auto_upload)
-                print(f"\nProcessed {len(results)} videos")
-                total_clips = sum(len(r['clips']) for r in results)
-                total_uploads = sum(len(r['scheduled_uploads']) for r in results)
+                # Process all videos, reporting each one as it finishes
+                processed = total_clips = total_uploads = 0
+                for result in system.process_all_videos(args.platforms, args.auto_upload):
+                    processed += 1
+                    total_clips += len(result['clips'])
+                    total_uploads += len(result['scheduled_uploads'])
+                    print(f"Processed: {result['video_path']} "
+                          f"({len(result['clips'])} clips, {len(result['scheduled_uploads'])} uploads)")
+                print(f"\nProcessed {processed} videos")
                 print(f"Total clips extracted: {total_clips}")
                 print(f"Total uploads scheduled: {total_uploads}")
             
             if args.auto_upload:
                 print("\nScheduler is running. Press Ctrl+C to stop.")
-                import time
-                while True:
-                    time.sleep(1)
+                # Wait until Ctrl+C (or SIGTERM) sets the event. Only Windows
+                # needs a timeout, since an untimed wait there can't be interrupted.
+                stop_event = threading.Event()
+                signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+                if hasattr(signal, 'SIGTERM'):
+                    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+                if os.name == 'nt':
+                    while not stop_event.wait(1):
+                        pass
+                else:
+                    stop_event.wait()
+                print("\nStopping scheduler...")
         
         except KeyboardInterrupt:
             print("\nStopping scheduler...")
         finally:
             system.stop_scheduler()
+        
+        return
+    
+    # The remaining commands only touch credentials or upload state, so skip
+    # building the analyzer, encoders, uploaders and scheduler
+    settings, _ = load_config()
+    setup_logging(settings)
     
-    elif args.command == 'credentials':
+    if args.command == 'credentials':
         # Set credential
-        system.credential_manager.encrypt_credential(
+        CredentialManager().encrypt_credential(
             args.platform, 
             args.field, 
             args.value
@@ -347,20 +935,24 @@ def main():
     
     elif args.command == 'queue':
         # View queue
-        queue = system.state_manager.get_queue(args.platform)
-        print(f"\nUpload Queue ({len(queue)} tasks):")
-        for task in queue:
-            print(f"  - {task['clip_path']} -> {task['platform']} at {task.get('scheduled_time', 'N/A')}")
+        upload_queue = StateManager(settings['paths']['state_files']).get_queue(args.platform)
+        print(f"\nUpload Queue ({len(upload_queue)} tasks):")
+        sys.stdout.write(''.join(
+            f"  - {task['clip_path']} -> {task['platform']} at {task.get('scheduled_time', 'N/A')}\n"
+            for task in upload_queue
+        ))
     
     elif args.command == 'history':
         # View history
-        history = system.state_manager.get_history(
+        history = StateManager(settings['paths']['state_files']).get_history(
             platform=args.platform, 
             limit=args.limit
         )
         print(f"\nUpload History ({len(history)} records):")
-        for record in history:
-            print(f"  - {record['clip_path']} -> {record['platform']} ({record['status']}) at {record.get('upload_time', 'N/A')}")
+        sys.stdout.write(''.join(
+            f"  - {record['clip_path']} -> {record['platform']} ({record['status']}) at {record.get('upload_time', 'N/A')}\n"
+            for record in history
+        ))
     
     else:
         parser.print_help()
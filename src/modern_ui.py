@@ -4,24 +4,73 @@ A customtkinter-based interface with modern, dark-mode friendly design
 """
 import os
 import sys
+import copy
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import threading
 import logging
+from collections import deque
 import yaml
 from pathlib import Path
 import shutil
 
+# Prefer the libyaml-backed loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+# Parsed YAML files by path, as (mtime_ns, size, data)
+_YAML_CACHE = {}
+
+
+def _yaml_signature(path):
+    """(mtime_ns, size) of a file, so edits on disk invalidate the cache"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_yaml_cached(path):
+    """
+    Load a YAML file, reusing the parsed result until the file changes
+    
+    Args:
+        path: Path to the YAML file
+    
+    Returns:
+        A copy of the parsed data that the caller may modify
+    """
+    key = os.fspath(path)
+    signature = _yaml_signature(key)
+    entry = _YAML_CACHE.get(key)
+    if entry is None or entry[:2] != signature:
+        with open(key, 'r') as f:
+            data = yaml.load(f, Loader=SafeLoader)
+        entry = (*signature, data)
+        _YAML_CACHE[key] = entry
+    return copy.deepcopy(entry[2])
+
+
+def _remember_yaml(path, data):
+    """Record data just written to path so the next load skips the parse"""
+    key = os.fspath(path)
+    _YAML_CACHE[key] = (*_yaml_signature(key), copy.deepcopy(data))
+
 # Add src to path
 sys.path.insert(0, os.path.dirname(__file__))
 
-# Import main system
-from main import VideoClippingSystem
-
 # Set appearance mode and default color theme
 ctk.set_appearance_mode("dark")  # Modes: "System" (default), "Dark", "Light"
 ctk.set_default_color_theme("blue")  # Themes: "blue" (default), "green", "dark-blue"
 
+# How often buffered log lines are written to the log text area
+LOG_FLUSH_INTERVAL_MS = 50
+# Pending lines that trigger a flush without waiting for the timer
+LOG_FLUSH_BATCH_SIZE = 32
+
+# Shared by every UI log handler
+_LOG_FORMATTER = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+
 
 class ModernVideoClippingUI:
     """Modern UI for controlling the video clipping system"""
@@ -37,6 +86,13 @@ class ModernVideoClippingUI:
         self.processing_thread = None
         self.is_processing = False
         
+        # Log lines from any thread, written to the text area in batches
+        self._log_buf = deque()
+        self._log_lock = threading.Lock()
+        self._log_flush_id = None
+        self._log_flush_queued = False
+        self._text_handler = None
+        
         # Config file path
         self.config_path = Path(__file__).parent.parent / 'config' / 'settings.yaml'
         self.input_videos_path = Path(__file__).parent.parent / 'input' / 'videos'
@@ -52,12 +108,30 @@ class ModernVideoClippingUI:
         
         # Setup logging to redirect to text area
         self.setup_logging()
+        self._log_flush_id = self.root.after(LOG_FLUSH_INTERVAL_MS, self._flush_logs)
         
         # Handle window close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
+    def _create_fonts(self):
+        """Create the fonts shared by all widgets (one Tk font each)"""
+        return {
+            'h1': ctk.CTkFont(size=24, weight="bold"),
+            'h2': ctk.CTkFont(size=20, weight="bold"),
+            'section': ctk.CTkFont(size=16, weight="bold"),
+            'button': ctk.CTkFont(size=14),
+            'button_bold': ctk.CTkFont(size=14, weight="bold"),
+            'option': ctk.CTkFont(size=13),
+            'option_bold': ctk.CTkFont(size=13, weight="bold"),
+            'label': ctk.CTkFont(size=12),
+            'small': ctk.CTkFont(size=10),
+            'mono': ctk.CTkFont(family="Courier", size=11)
+        }
+    
     def setup_ui(self):
         """Setup UI components"""
+        self._fonts = self._create_fonts()
+        
         # Configure grid weight
         self.root.grid_rowconfigure(0, weight=1)
         self.root.grid_columnconfigure(1, weight=1)
@@ -71,7 +145,7 @@ class ModernVideoClippingUI:
         self.logo_label = ctk.CTkLabel(
             self.sidebar, 
             text="🎬 Video Clipper",
-            font=ctk.CTkFont(size=20, weight="bold")
+            font=self._fonts['h2']
         )
         self.logo_label.grid(row=0, column=0, padx=20, pady=(20, 10))
         
@@ -79,7 +153,7 @@ class ModernVideoClippingUI:
         self.version_label = ctk.CTkLabel(
             self.sidebar,
             text="v2.0 - Modern UI",
-            font=ctk.CTkFont(size=10)
+            font=self._fonts['small']
         )
         self.version_label.grid(row=1, column=0, padx=20, pady=(0, 20))
         
@@ -89,7 +163,7 @@ class ModernVideoClippingUI:
             text="📁 Select Videos",
             command=self.select_video_files,
             height=40,
-            font=ctk.CTkFont(size=14)
+            font=self._fonts['button']
         )
         self.select_files_btn.grid(row=2, column=0, padx=20, pady=10)
         
@@ -99,7 +173,7 @@ class ModernVideoClippingUI:
             text="▶ Start Processing",
             command=self.start_processing,
             height=40,
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=self._fonts['button_bold'],
             fg_color="green",
             hover_color="darkgreen"
         )
@@ -111,7 +185,7 @@ class ModernVideoClippingUI:
             text="⏹ Stop Processing",
             command=self.stop_processing,
             height=40,
-            font=ctk.CTkFont(size=14),
+            font=self._fonts['button'],
             fg_color="red",
             hover_color="darkred",
             state="disabled"
@@ -124,7 +198,7 @@ class ModernVideoClippingUI:
             text="💾 Save Config",
             command=self.save_config,
             height=35,
-            font=ctk.CTkFont(size=13)
+            font=self._fonts['option']
         )
         self.save_config_btn.grid(row=5, column=0, padx=20, pady=10)
         
@@ -134,7 +208,7 @@ class ModernVideoClippingUI:
             text="🗑 Clear Logs",
             command=self.clear_logs,
             height=35,
-            font=ctk.CTkFont(size=13)
+            font=self._fonts['option']
         )
         self.clear_logs_btn.grid(row=6, column=0, padx=20, pady=10)
         
@@ -160,7 +234,7 @@ class ModernVideoClippingUI:
         self.title_label = ctk.CTkLabel(
             self.main_frame,
             text="Configuration Dashboard",
-            font=ctk.CTkFont(size=24, weight="bold")
+            font=self._fonts['h1']
         )
         self.title_label.grid(row=0, column=0, pady=(0, 20), sticky="w", padx=20)
         
@@ -185,7 +259,7 @@ class ModernVideoClippingUI:
         self.status_label = ctk.CTkLabel(
             self.status_frame,
             text="● Status: Ready",
-            font=ctk.CTkFont(size=12),
+            font=self._fonts['label'],
             anchor="w"
         )
         self.status_label.pack(side="left", padx=20, pady=10)
@@ -208,14 +282,14 @@ class ModernVideoClippingUI:
         ctk.CTkLabel(
             metadata_frame,
             text="Metadata Settings",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=self._fonts['section']
         ).grid(row=0, column=0, columnspan=2, sticky="w", padx=10, pady=(10, 5))
         
         # Default Description
         ctk.CTkLabel(
             metadata_frame,
             text="Default Description:",
-            font=ctk.CTkFont(size=12)
+            font=self._fonts['label']
         ).grid(row=1, column=0, sticky="w", padx=10, pady=(10, 5))
         
         self.description_text = ctk.CTkTextbox(
@@ -229,7 +303,7 @@ class ModernVideoClippingUI:
         ctk.CTkLabel(
             metadata_frame,
             text="Default Hashtags (comma-separated):",
-            font=ctk.CTkFont(size=12)
+            font=self._fonts['label']
         ).grid(row=3, column=0, sticky="w", padx=10, pady=(10, 5))
         
         self.hashtags_entry = ctk.CTkEntry(
@@ -246,14 +320,14 @@ class ModernVideoClippingUI:
         ctk.CTkLabel(
             params_frame,
             text="Processing Parameters",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=self._fonts['section']
         ).grid(row=0, column=0, columnspan=2, sticky="w", padx=10, pady=(10, 15))
         
         # Min Viral Score
         ctk.CTkLabel(
             params_frame,
             text="Min Viral Score Threshold:",
-            font=ctk.CTkFont(size=12)
+            font=self._fonts['label']
         ).grid(row=1, column=0, sticky="w", padx=10, pady=10)
         
         self.viral_score_frame = ctk.CTkFrame(params_frame)
@@ -280,7 +354,7 @@ class ModernVideoClippingUI:
         ctk.CTkLabel(
             params_frame,
             text="Max Clips per Video:",
-            font=ctk.CTkFont(size=12)
+            font=self._fonts['label']
         ).grid(row=2, column=0, sticky="w", padx=10, pady=10)
         
         self.max_clips_frame = ctk.CTkFrame(params_frame)
@@ -311,7 +385,7 @@ class ModernVideoClippingUI:
         ctk.CTkLabel(
             platform_frame,
             text="Target Platforms",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=self._fonts['section']
         ).grid(row=0, column=0, sticky="w", padx=10, pady=(10, 15))
         
         # Platform checkboxes
@@ -320,7 +394,7 @@ class ModernVideoClippingUI:
             platform_frame,
             text="📷 Instagram Reels",
             variable=self.instagram_var,
-            font=ctk.CTkFont(size=13)
+            font=self._fonts['option']
         )
         self.instagram_check.grid(row=1, column=0, sticky="w", padx=20, pady=5)
         
@@ -329,7 +403,7 @@ class ModernVideoClippingUI:
             platform_frame,
             text="▶ YouTube Shorts",
             variable=self.youtube_var,
-            font=ctk.CTkFont(size=13)
+            font=self._fonts['option']
         )
         self.youtube_check.grid(row=2, column=0, sticky="w", padx=20, pady=5)
         
@@ -338,7 +412,7 @@ class ModernVideoClippingUI:
             platform_frame,
             text="🎵 TikTok",
             variable=self.tiktok_var,
-            font=ctk.CTkFont(size=13)
+            font=self._fonts['option']
         )
         self.tiktok_check.grid(row=3, column=0, sticky="w", padx=20, pady=(5, 20))
         
@@ -348,7 +422,7 @@ class ModernVideoClippingUI:
             scrollable_frame,
             text="🚀 Auto-schedule uploads after processing",
             variable=self.auto_upload_var,
-            font=ctk.CTkFont(size=13, weight="bold")
+            font=self._fonts['option_bold']
         )
         self.auto_upload_check.grid(row=3, column=0, sticky="w", padx=20, pady=20)
     
@@ -362,7 +436,7 @@ class ModernVideoClippingUI:
         self.log_text = ctk.CTkTextbox(
             logs_tab,
             wrap="word",
-            font=ctk.CTkFont(family="Courier", size=11)
+            font=self._fonts['mono']
         )
         self.log_text.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
     
@@ -391,32 +465,48 @@ class ModernVideoClippingUI:
         )
         
         if filenames:
-            copied_count = 0
-            for file_path in filenames:
-                try:
-                    # Copy file to input directory
-                    filename = os.path.basename(file_path)
-                    dest_path = self.input_videos_path / filename
-                    
-                    shutil.copy2(file_path, dest_path)
-                    copied_count += 1
-                    self.log_message(f"Copied: {filename} -> {dest_path}")
+            # Copy in the background so large videos don't freeze the window
+            self.select_files_btn.configure(state="disabled")
+            threading.Thread(
+                target=self._copy_videos_worker,
+                args=(filenames,),
+                daemon=True
+            ).start()
+    
+    def _copy_videos_worker(self, filenames):
+        """Copy selected videos to the input directory (executed in separate thread)"""
+        copied_count = 0
+        for file_path in filenames:
+            try:
+                # Copy file to input directory
+                filename = os.path.basename(file_path)
+                dest_path = self.input_videos_path / filename
                 
-                except Exception as e:
-                    self.log_message(f"Error copying {file_path}: {e}")
+                shutil.copy2(file_path, dest_path)
+                copied_count += 1
+                self.log_message(f"Copied: {filename} -> {dest_path}")
             
+            except Exception as e:
+                self.log_message(f"Error copying {file_path}: {e}")
+        
+        if copied_count > 0:
+            self.log_message(f"\n✓ {copied_count} video file(s) ready for processing\n")
+        
+        def finish():
+            self.select_files_btn.configure(state="normal")
             if copied_count > 0:
                 messagebox.showinfo(
                     "Success",
                     f"Successfully copied {copied_count} video(s) to {self.input_videos_path}"
                 )
-                self.log_message(f"\n✓ {copied_count} video file(s) ready for processing\n")
+        
+        # Widgets and dialogs are only touched from the main thread
+        self.root.after(0, finish)
     
     def load_config_values(self):
         """Load current configuration values from settings.yaml"""
         try:
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
+            config = _load_yaml_cached(self.config_path)
             
             metadata = config.get('metadata', {})
             
@@ -441,8 +531,7 @@ class ModernVideoClippingUI:
         """Save configuration to settings.yaml"""
         try:
             # Read current config
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
+            config = _load_yaml_cached(self.config_path)
             
             # Update metadata section
             if 'metadata' not in config:
@@ -458,7 +547,8 @@ class ModernVideoClippingUI:
             
             # Write back to file
             with open(self.config_path, 'w') as f:
-                yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+                yaml.dump(config, f, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
+            _remember_yaml(self.config_path, config)
             
             self.log_message("✓ Configuration saved successfully!\n")
             messagebox.showinfo("Success", "Configuration saved successfully!")
@@ -499,11 +589,12 @@ class ModernVideoClippingUI:
         self.status_label.configure(text="● Status: Processing...")
         self.tabview.set("Logs")  # Switch to logs tab
         
+        # Set before the thread starts, which checks it between videos
+        self.is_processing = True
+        
         # Start processing in a separate thread
         self.processing_thread = threading.Thread(target=self.run_processing, daemon=True)
         self.processing_thread.start()
-        
-        self.is_processing = True
     
     def run_processing(self):
         """Run the video processing (executed in separate thread)"""
@@ -517,7 +608,9 @@ class ModernVideoClippingUI:
             self.log_message(f"Auto-upload: {'Enabled' if self.auto_upload else 'Disabled'}")
             self.log_message("=" * 80 + "\n")
             
-            # Initialize system
+            # Initialize system (imported here, on the processing thread, so
+            # opening the UI to edit config doesn't load the pipeline)
+            from main import VideoClippingSystem
             self.system = VideoClippingSystem()
             self.log_message("✓ System initialized successfully\n")
             
@@ -537,10 +630,18 @@ class ModernVideoClippingUI:
             
             # Process videos
             results = []
+            video_count = len(videos)
             for i, video_path in enumerate(videos, 1):
-                self.log_message(f"\n{'='*80}")
-                self.log_message(f"Processing video {i}/{len(videos)}: {os.path.basename(video_path)}")
-                self.log_message(f"{'='*80}\n")
+                # Stopped by the user: skip the remaining videos and their log lines
+                if not self.is_processing:
+                    break
+                
+                video_name = os.path.basename(video_path)
+                self.log_message(
+                    f"\n{'='*80}\n"
+                    f"Processing video {i}/{video_count}: {video_name}\n"
+                    f"{'='*80}\n"
+                )
                 
                 # Update the process_video call to use our parameters
                 result = self.process_video_with_params(video_path)
@@ -621,21 +722,12 @@ class ModernVideoClippingUI:
             
             # Step 3: Optimize and generate metadata for each platform
             self.log_message("Step 3: Optimizing clips and generating metadata...")
-            for clip_info in clips:
-                clip_path = clip_info['path']
-                
-                # Generate metadata for selected platforms
-                metadata = self.system.metadata_generator.generate_metadata_for_clip(
-                    clip_info,
-                    self.selected_platforms
-                )
-                
-                # Optimize for each platform
+            optimized_clips = self.system.pipeline.optimize_clips(clips, self.selected_platforms)
+            
+            for clip_info, metadata, optimized in optimized_clips:
+                # Schedule each platform's output
                 for platform in self.selected_platforms:
-                    optimized_path = self.system.format_optimizer.optimize_for_platform(
-                        clip_path,
-                        platform
-                    )
+                    optimized_path = optimized.get(platform)
                     
                     if optimized_path and self.auto_upload:
                         # Create upload task
@@ -693,36 +785,71 @@ class ModernVideoClippingUI:
         """Setup logging to redirect to UI text area"""
         # Create custom handler
         class TextHandler(logging.Handler):
-            def __init__(self, text_widget, root):
+            def __init__(self, log_message):
                 logging.Handler.__init__(self)
-                self.text_widget = text_widget
-                self.root = root
+                self.log_message = log_message
+                self._closed = False
             
             def emit(self, record):
-                msg = self.format(record)
-                def append():
-                    self.text_widget.insert('end', msg + '\n')
-                    self.text_widget.see('end')
-                # Schedule on main thread
-                self.root.after(0, append)
+                # Worker threads may still log after the window is gone
+                if self._closed:
+                    return
+                # Buffered and written on the main thread by _flush_logs
+                self.log_message(self.format(record))
+            
+            def close(self):
+                self._closed = True
+                logging.Handler.close(self)
         
         # Add handler to root logger
-        text_handler = TextHandler(self.log_text, self.root)
-        text_handler.setFormatter(
-            logging.Formatter('%(asctime)s - %(levelname)s - %(message)s',
-                            datefmt='%H:%M:%S')
-        )
-        logging.getLogger().addHandler(text_handler)
+        self._text_handler = TextHandler(self.log_message)
+        self._text_handler.setFormatter(_LOG_FORMATTER)
+        logging.getLogger().addHandler(self._text_handler)
         logging.getLogger().setLevel(logging.INFO)
     
     def log_message(self, message):
-        """Log a message to the text area"""
-        def append():
-            self.log_text.insert('end', message + '\n')
+        """Log a message to the text area (safe to call from any thread)"""
+        with self._log_lock:
+            self._log_buf.append(message)
+            flush_now = (
+                len(self._log_buf) >= LOG_FLUSH_BATCH_SIZE
+                and not self._log_flush_queued
+                and self._log_flush_id is not None
+            )
+            if flush_now:
+                self._log_flush_queued = True
+        
+        # A burst of lines is written as soon as the main thread is idle
+        if flush_now:
+            self.root.after_idle(self._write_pending_logs)
+    
+    def _write_pending_logs(self):
+        """Write buffered log lines in one insert (main thread only)"""
+        with self._log_lock:
+            messages = list(self._log_buf)
+            self._log_buf.clear()
+            self._log_flush_queued = False
+        
+        if messages:
+            self.log_text.insert('end', '\n'.join(messages) + '\n')
             self.log_text.see('end')
+    
+    def _flush_logs(self):
+        """Write buffered log lines, then reschedule"""
+        self._write_pending_logs()
+        self._log_flush_id = self.root.after(LOG_FLUSH_INTERVAL_MS, self._flush_logs)
+    
+    def _close_window(self):
+        """Detach UI logging and destroy the window"""
+        if self._text_handler is not None:
+            logging.getLogger().removeHandler(self._text_handler)
+            self._text_handler.close()
+        
+        if self._log_flush_id is not None:
+            self.root.after_cancel(self._log_flush_id)
+            self._log_flush_id = None
         
-        # Schedule on main thread
-        self.root.after(0, append)
+        self.root.destroy()
     
     def update_status_safe(self, status_text):
         """Safely update status from any thread"""
@@ -730,6 +857,8 @@ class ModernVideoClippingUI:
     
     def clear_logs(self):
         """Clear the log text area"""
+        with self._log_lock:
+            self._log_buf.clear()
         self.log_text.delete('1.0', 'end')
         self.log_message("Logs cleared.\n")
     
@@ -749,9 +878,9 @@ class ModernVideoClippingUI:
                         self.log_message(f"⚠ Error stopping system: {e}\n")
                 
                 self.is_processing = False
-                self.root.destroy()
+                self._close_window()
         else:
-            self.root.destroy()
+            self._close_window()
 
 
 def main():
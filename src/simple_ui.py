@@ -232,17 +232,18 @@ class VideoClippingUI:
             
             # Process all videos with auto-upload enabled
             self.log_message("\nProcessing videos...")
-            results = self.system.process_all_videos(
+            processed = total_clips = total_uploads = 0
+            for result in self.system.process_all_videos(
                 platforms=['instagram', 'youtube', 'tiktok'],
                 auto_upload=True
-            )
+            ):
+                processed += 1
+                total_clips += len(result['clips'])
+                total_uploads += len(result['scheduled_uploads'])
             
             # Log results
-            total_clips = sum(len(r['clips']) for r in results)
-            total_uploads = sum(len(r['scheduled_uploads']) for r in results)
-            
             self.log_message(f"\nProcessing Complete!")
-            self.log_message(f"Videos processed: {len(results)}")
+            self.log_message(f"Videos processed: {processed}")
             self.log_message(f"Clips extracted: {total_clips}")
             self.log_message(f"Uploads scheduled: {total_uploads}")
             
@@ -2,7 +2,9 @@
 Credential Manager - Handle encryption and decryption of sensitive credentials
 """
 import os
+import time
 import base64
+import threading
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -11,6 +13,11 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Decrypted values are kept this long (seconds) so rotated credentials are
+# picked up without decrypting on every upload
+CREDENTIAL_CACHE_TTL = 300
+CREDENTIAL_CACHE_SIZE = 16
+
 
 class CredentialManager:
     """Manage encryption and decryption of platform credentials"""
@@ -25,6 +32,35 @@ class CredentialManager:
         self.config_path = config_path
         self.credentials = self._load_credentials()
         self.fernet = self._init_encryption()
+        
+        # (platform, field) -> (expires_at, value); field None holds get_credentials
+        self._decrypted = {}
+        self._decrypted_lock = threading.Lock()
+    
+    def _cached(self, key):
+        """Return a cached decrypted value, or None if missing or expired"""
+        with self._decrypted_lock:
+            entry = self._decrypted.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._decrypted[key]
+                return None
+            return entry[1]
+    
+    def _remember(self, key, value):
+        """Cache a decrypted value, evicting the oldest entry when full"""
+        with self._decrypted_lock:
+            self._decrypted.pop(key, None)
+            if len(self._decrypted) >= CREDENTIAL_CACHE_SIZE:
+                self._decrypted.pop(next(iter(self._decrypted)))
+            self._decrypted[key] = (time.monotonic() + CREDENTIAL_CACHE_TTL, value)
+    
+    def _forget(self, platform):
+        """Drop cached values for a platform after its credentials change"""
+        with self._decrypted_lock:
+            for key in [key for key in self._decrypted if key[0] == platform]:
+                del self._decrypted[key]
     
     def _init_encryption(self):
         """Initialize encryption using environment key or generate new key"""
@@ -94,6 +130,7 @@ class CredentialManager:
         
         self.credentials[platform][field] = encrypted_value
         self.credentials[platform]['encrypted'] = True
+        self._forget(platform)
         
         self._save_credentials()
         logger.info(f"Encrypted {field} for {platform}")
@@ -119,8 +156,13 @@ class CredentialManager:
         is_encrypted = self.credentials[platform].get('encrypted', False)
         
         if is_encrypted:
+            cached = self._cached((platform, field))
+            if cached is not None:
+                return cached
             try:
-                return self.fernet.decrypt(encrypted_value.encode()).decode()
+                value = self.fernet.decrypt(encrypted_value.encode()).decode()
+                self._remember((platform, field), value)
+                return value
             except Exception as e:
                 logger.error(f"Failed to decrypt {field} for {platform}: {e}")
                 return None
@@ -148,6 +190,10 @@ class CredentialManager:
         platform_creds.pop('encrypted', None)
         
         if is_encrypted:
+            cached = self._cached((platform, None))
+            if cached is not None:
+                return dict(cached)
+            
             # Decrypt all fields
             decrypted = {}
             for key, value in platform_creds.items():
@@ -159,7 +205,8 @@ class CredentialManager:
                         decrypted[key] = None
                 else:
                     decrypted[key] = value
-            return decrypted
+            self._remember((platform, None), decrypted)
+            return dict(decrypted)
         
         return platform_creds
     
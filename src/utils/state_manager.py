@@ -1,9 +1,11 @@
 """
-State Manager - Manage JSON state files for upload tracking
+State Manager - Manage upload history and queue state in SQLite
 """
 import json
 import os
+import sqlite3
 import logging
+import threading
 from datetime import datetime
 from typing import Dict, List, Any
 
@@ -21,28 +23,51 @@ class StateManager:
             state_dir: Directory to store state files
         """
         self.state_dir = state_dir
+        self.db_file = os.path.join(state_dir, "upload_state.db")
+        # Earlier JSON state files, imported once when the database is created
         self.history_file = os.path.join(state_dir, "upload_history.json")
         self.queue_file = os.path.join(state_dir, "upload_queue.json")
         
         # Ensure state directory exists
         os.makedirs(state_dir, exist_ok=True)
         
-        # Initialize state files if they don't exist
+        # One connection shared by the scheduler's threads, serialized by a lock
+        self._lock = threading.Lock()
+        is_new = not os.path.exists(self.db_file)
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        
+        # Initialize state tables if they don't exist
         self._init_state_files()
+        if is_new:
+            self._import_json_state()
     
     def _init_state_files(self):
-        """Initialize state files with empty structures"""
-        if not os.path.exists(self.history_file):
-            self._save_json(self.history_file, {
-                "uploads": [],
-                "last_updated": datetime.now().isoformat()
-            })
-        
-        if not os.path.exists(self.queue_file):
-            self._save_json(self.queue_file, {
-                "queue": [],
-                "last_updated": datetime.now().isoformat()
-            })
+        """Initialize state tables and the indexes used by the lookups"""
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY,
+                    platform TEXT,
+                    status TEXT,
+                    upload_time TEXT,
+                    record TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS history_platform_time
+                    ON history (platform, upload_time DESC);
+                CREATE INDEX IF NOT EXISTS history_time
+                    ON history (upload_time DESC);
+                
+                CREATE TABLE IF NOT EXISTS queue (
+                    id INTEGER PRIMARY KEY,
+                    clip_path TEXT,
+                    platform TEXT,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    scheduled_time TEXT,
+                    task TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS queue_task
+                    ON queue (clip_path, platform);
+            """)
     
     def _load_json(self, file_path):
         """Load JSON from file"""
@@ -53,13 +78,46 @@ class StateManager:
             logger.error(f"Error loading {file_path}: {e}")
             return {}
     
-    def _save_json(self, file_path, data):
-        """Save JSON to file"""
-        try:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving {file_path}: {e}")
+    def _import_json_state(self):
+        """Copy history and queue from the earlier JSON state files"""
+        if os.path.exists(self.history_file):
+            uploads = self._load_json(self.history_file).get('uploads', [])
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO history (platform, status, upload_time, record) VALUES (?, ?, ?, ?)",
+                    [self._history_row(record) for record in uploads]
+                )
+            logger.info(f"Imported {len(uploads)} upload records from {self.history_file}")
+        
+        if os.path.exists(self.queue_file):
+            tasks = self._load_json(self.queue_file).get('queue', [])
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO queue (clip_path, platform, priority, scheduled_time, task) VALUES (?, ?, ?, ?, ?)",
+                    [self._queue_row(task) for task in tasks]
+                )
+            logger.info(f"Imported {len(tasks)} queued tasks from {self.queue_file}")
+    
+    @staticmethod
+    def _history_row(record):
+        """Indexed columns plus the serialized record"""
+        return (
+            record.get('platform'),
+            record.get('status'),
+            record.get('upload_time', ''),
+            json.dumps(record, default=str)
+        )
+    
+    @staticmethod
+    def _queue_row(task):
+        """Indexed columns plus the serialized task"""
+        return (
+            task.get('clip_path'),
+            task.get('platform'),
+            task.get('priority', 0),
+            task.get('scheduled_time'),
+            json.dumps(task, default=str)
+        )
     
     def add_to_history(self, upload_record: Dict[str, Any]):
         """
@@ -74,16 +132,19 @@ class StateManager:
                 - status: Upload status (success, failed, pending)
                 - metadata: Caption, hashtags, etc.
         """
-        history = self._load_json(self.history_file)
-        
         # Add timestamp if not present
         if 'upload_time' not in upload_record:
             upload_record['upload_time'] = datetime.now().isoformat()
         
-        history['uploads'].append(upload_record)
-        history['last_updated'] = datetime.now().isoformat()
-        
-        self._save_json(self.history_file, history)
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO history (platform, status, upload_time, record) VALUES (?, ?, ?, ?)",
+                    self._history_row(upload_record)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error saving upload record: {e}")
+            return
         logger.info(f"Added upload record to history: {upload_record.get('clip_path')} -> {upload_record.get('platform')}")
     
     def get_history(self, platform=None, status=None, limit=None):
@@ -98,24 +159,33 @@ class StateManager:
         Returns:
             List of upload records
         """
-        history = self._load_json(self.history_file)
-        uploads = history.get('uploads', [])
+        query = "SELECT record FROM history"
+        conditions = []
+        params = []
         
         # Apply filters
         if platform:
-            uploads = [u for u in uploads if u.get('platform') == platform]
+            conditions.append("platform = ?")
+            params.append(platform)
         
         if status:
-            uploads = [u for u in uploads if u.get('status') == status]
+            conditions.append("status = ?")
+            params.append(status)
+        
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
         
         # Sort by upload time (most recent first)
-        uploads.sort(key=lambda x: x.get('upload_time', ''), reverse=True)
+        query += " ORDER BY upload_time DESC"
         
         # Apply limit
         if limit:
-            uploads = uploads[:limit]
+            query += " LIMIT ?"
+            params.append(limit)
         
-        return uploads
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
     
     def add_to_queue(self, upload_task: Dict[str, Any]):
         """
@@ -129,8 +199,6 @@ class StateManager:
                 - metadata: Caption, hashtags, etc.
                 - priority: Task priority (higher = more urgent)
         """
-        queue = self._load_json(self.queue_file)
-        
         # Add creation time if not present
         if 'created_time' not in upload_task:
             upload_task['created_time'] = datetime.now().isoformat()
@@ -139,10 +207,15 @@ class StateManager:
         if 'priority' not in upload_task:
             upload_task['priority'] = 0
         
-        queue['queue'].append(upload_task)
-        queue['last_updated'] = datetime.now().isoformat()
-        
-        self._save_json(self.queue_file, queue)
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO queue (clip_path, platform, priority, scheduled_time, task) VALUES (?, ?, ?, ?, ?)",
+                    self._queue_row(upload_task)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error saving queued task: {e}")
+            return
         logger.info(f"Added task to queue: {upload_task.get('clip_path')} -> {upload_task.get('platform')}")
     
     def get_queue(self, platform=None):
@@ -155,20 +228,22 @@ class StateManager:
         Returns:
             List of upload tasks sorted by priority and scheduled time
         """
-        queue = self._load_json(self.queue_file)
-        tasks = queue.get('queue', [])
+        query = "SELECT task FROM queue"
+        params = []
         
         # Apply filters
         if platform:
-            tasks = [t for t in tasks if t.get('platform') == platform]
+            query += " WHERE platform = ?"
+            params.append(platform)
         
-        # Sort by priority (descending) then scheduled time (ascending)
-        tasks.sort(key=lambda x: (
-            -x.get('priority', 0),
-            x.get('scheduled_time', datetime.now().isoformat())
-        ))
+        # Sort by priority (descending) then scheduled time (ascending);
+        # unscheduled tasks sort as if due now
+        query += " ORDER BY priority DESC, COALESCE(scheduled_time, ?)"
+        params.append(datetime.now().isoformat())
         
-        return tasks
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
     
     def remove_from_queue(self, clip_path: str, platform: str):
         """
@@ -178,16 +253,11 @@ class StateManager:
             clip_path: Clip file path
             platform: Platform name
         """
-        queue = self._load_json(self.queue_file)
-        
-        # Filter out the task
-        queue['queue'] = [
-            t for t in queue['queue']
-            if not (t.get('clip_path') == clip_path and t.get('platform') == platform)
-        ]
-        queue['last_updated'] = datetime.now().isoformat()
-        
-        self._save_json(self.queue_file, queue)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM queue WHERE clip_path = ? AND platform = ?",
+                (clip_path, platform)
+            )
         logger.info(f"Removed task from queue: {clip_path} -> {platform}")
     
     def update_queue_task(self, clip_path: str, platform: str, updates: Dict[str, Any]):
@@ -199,16 +269,21 @@ class StateManager:
             platform: Platform name
             updates: Dictionary of fields to update
         """
-        queue = self._load_json(self.queue_file)
-        
-        # Find and update the task
-        for task in queue['queue']:
-            if task.get('clip_path') == clip_path and task.get('platform') == platform:
+        with self._lock, self._conn:
+            # Find and update the task
+            row = self._conn.execute(
+                "SELECT id, task FROM queue WHERE clip_path = ? AND platform = ? ORDER BY id LIMIT 1",
+                (clip_path, platform)
+            ).fetchone()
+            
+            if row is not None:
+                task = json.loads(row[1])
                 task.update(updates)
-                break
-        
-        queue['last_updated'] = datetime.now().isoformat()
-        self._save_json(self.queue_file, queue)
+                self._conn.execute(
+                    "UPDATE queue SET clip_path = ?, platform = ?, priority = ?, scheduled_time = ?, task = ? "
+                    "WHERE id = ?",
+                    (*self._queue_row(task), row[0])
+                )
         logger.info(f"Updated task in queue: {clip_path} -> {platform}")
     
     def get_last_upload_time(self, platform: str):
@@ -228,16 +303,12 @@ class StateManager:
     
     def clear_history(self):
         """Clear upload history"""
-        self._save_json(self.history_file, {
-            "uploads": [],
-            "last_updated": datetime.now().isoformat()
-        })
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history")
         logger.info("Cleared upload history")
     
     def clear_queue(self):
         """Clear upload queue"""
-        self._save_json(self.queue_file, {
-            "queue": [],
-            "last_updated": datetime.now().isoformat()
-        })
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM queue")
         logger.info("Cleared upload queue")
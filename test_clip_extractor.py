@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for clip extraction command building
+This tests the FFmpeg commands without running FFmpeg
+"""
+import os
+import sys
+import logging
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def make_extractor(**overrides):
+    """Create a ClipExtractor that never probes for NVENC"""
+    from core.clip_extractor import ClipExtractor
+    
+    config = {'hardware_encoding': False, 'video_codec': 'libx264', 'quality_crf': 23}
+    config.update(overrides)
+    return ClipExtractor(config)
+
+def test_plain_trim_stream_copies():
+    """Test that a trim without filters remuxes instead of re-encoding"""
+    logger.info("Testing stream-copy trim...")
+    
+    try:
+        extractor = make_extractor()
+        cmd = extractor._build_ffmpeg_command('in.mp4', 'out.mp4', 12.5, 30)
+        
+        if '-c' not in cmd or cmd[cmd.index('-c') + 1] != 'copy':
+            logger.error(f"✗ Plain trim is not a stream copy: {cmd}")
+            return False
+        if '-c:v' in cmd:
+            logger.error(f"✗ Plain trim sets a video encoder: {cmd}")
+            return False
+        if cmd.index('-ss') > cmd.index('-i'):
+            logger.error(f"✗ Seek is not on the input side: {cmd}")
+            return False
+        
+        logger.info("✓ Plain trim stream-copies with an input-side seek")
+        return True
+    except Exception as e:
+        logger.error(f"✗ Stream-copy test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_filters_and_frame_accurate_reencode():
+    """Test that filters or frame-accurate cuts re-encode"""
+    logger.info("\nTesting re-encode cases...")
+    
+    try:
+        extractor = make_extractor()
+        
+        filtered = extractor._build_ffmpeg_command('in.mp4', 'out.mp4', 0, 30, filters='scale=1080:1920')
+        if filtered[filtered.index('-c:v') + 1] != 'libx264' or '-vf' not in filtered:
+            logger.error(f"✗ Filtered clip is not re-encoded: {filtered}")
+            return False
+        logger.info("✓ Filtered clip is re-encoded")
+        
+        accurate = extractor._build_ffmpeg_command('in.mp4', 'out.mp4', 0, 30, threads=2, frame_accurate=True)
+        if '-c:v' not in accurate or accurate[accurate.index('-threads') + 1] != '2':
+            logger.error(f"✗ Frame-accurate cut is not re-encoded with the thread cap: {accurate}")
+            return False
+        logger.info("✓ Frame-accurate cut is re-encoded")
+        
+        configured = make_extractor(frame_accurate_cuts=True)._build_ffmpeg_command('in.mp4', 'out.mp4', 0, 30)
+        if '-c:v' not in configured:
+            logger.error(f"✗ frame_accurate_cuts config is ignored: {configured}")
+            return False
+        logger.info("✓ frame_accurate_cuts config forces a re-encode")
+        
+        return True
+    except Exception as e:
+        logger.error(f"✗ Re-encode test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_nvenc_caps_parallel_clips():
+    """Test that NVENC limits the number of parallel encodes"""
+    logger.info("\nTesting parallel encode limit...")
+    
+    try:
+        extractor = make_extractor(max_parallel_clips=8, max_parallel_hw_encodes=3)
+        if extractor.max_parallel_clips != 8:
+            logger.error(f"✗ Software encodes limited to {extractor.max_parallel_clips}, expected 8")
+            return False
+        
+        # Pretend NVENC was detected
+        extractor._hw_encoder = 'h264_nvenc'
+        if extractor.max_parallel_clips != 3:
+            logger.error(f"✗ NVENC encodes limited to {extractor.max_parallel_clips}, expected 3")
+            return False
+        
+        logger.info("✓ NVENC encodes are capped at max_parallel_hw_encodes")
+        return True
+    except Exception as e:
+        logger.error(f"✗ Parallel limit test failed: {e}")
+        return False
+
+def main():
+    """Run all tests"""
+    logger.info("=" * 60)
+    logger.info("Clip Extractor Test Suite")
+    logger.info("=" * 60)
+    
+    tests = [
+        ("Stream-Copy Trim", test_plain_trim_stream_copies),
+        ("Re-encode Cases", test_filters_and_frame_accurate_reencode),
+        ("NVENC Parallel Limit", test_nvenc_caps_parallel_clips),
+    ]
+    
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            logger.error(f"Test '{name}' crashed: {e}")
+            results.append((name, False))
+    
+    # Summary
+    logger.info("\n" + "=" * 60)
+    logger.info("Test Summary")
+    logger.info("=" * 60)
+    
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+    
+    for name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        logger.info(f"{status}: {name}")
+    
+    logger.info(f"\nTotal: {passed}/{total} tests passed")
+    logger.info("=" * 60)
+    
+    if passed == total:
+        logger.info("\n🎉 All tests passed!")
+        return 0
+    else:
+        logger.warning(f"\n⚠ {total - passed} test(s) failed")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for credential caching
+This tests that decrypted credentials are cached for CREDENTIAL_CACHE_TTL
+"""
+import os
+import sys
+import logging
+import tempfile
+from unittest import mock
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def make_manager(directory):
+    """Create a CredentialManager with a throwaway key and credentials file"""
+    from cryptography.fernet import Fernet
+    from utils.credential_manager import CredentialManager
+    
+    with mock.patch.dict(os.environ, {'ENCRYPTION_KEY': Fernet.generate_key().decode()}):
+        return CredentialManager(os.path.join(directory, 'credentials.yaml'))
+
+def test_decrypted_values_expire():
+    """Test that decrypted credentials are reused until the TTL runs out"""
+    logger.info("Testing credential cache TTL...")
+    
+    try:
+        from utils import credential_manager
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = make_manager(tmp)
+            manager.encrypt_credential('github_api', 'token', 'secret-1')
+            
+            now = [1000.0]
+            with mock.patch.object(credential_manager.time, 'monotonic', lambda: now[0]), \
+                    mock.patch.object(manager, 'fernet', wraps=manager.fernet) as fernet:
+                first = manager.decrypt_credential('github_api', 'token')
+                second = manager.decrypt_credential('github_api', 'token')
+                if (first, second) != ('secret-1', 'secret-1') or fernet.decrypt.call_count != 1:
+                    logger.error(f"✗ Cached value not reused ({fernet.decrypt.call_count} decrypts)")
+                    return False
+                logger.info("✓ Decrypted value reused within the TTL")
+                
+                now[0] += credential_manager.CREDENTIAL_CACHE_TTL + 1
+                manager.decrypt_credential('github_api', 'token')
+                if fernet.decrypt.call_count != 2:
+                    logger.error("✗ Expired value was not decrypted again")
+                    return False
+                logger.info("✓ Expired value decrypted again")
+                
+                manager.encrypt_credential('github_api', 'token', 'secret-2')
+                if manager.decrypt_credential('github_api', 'token') != 'secret-2':
+                    logger.error("✗ Re-encrypted credential still returns the old value")
+                    return False
+                logger.info("✓ Changing a credential drops its cached value")
+        
+        return True
+    except Exception as e:
+        logger.error(f"✗ Credential cache test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def main():
+    """Run all tests"""
+    logger.info("=" * 60)
+    logger.info("Credential Manager Test Suite")
+    logger.info("=" * 60)
+    
+    tests = [
+        ("Credential Cache TTL", test_decrypted_values_expire),
+    ]
+    
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            logger.error(f"Test '{name}' crashed: {e}")
+            results.append((name, False))
+    
+    # Summary
+    logger.info("\n" + "=" * 60)
+    logger.info("Test Summary")
+    logger.info("=" * 60)
+    
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+    
+    for name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        logger.info(f"{status}: {name}")
+    
+    logger.info(f"\nTotal: {passed}/{total} tests passed")
+    logger.info("=" * 60)
+    
+    if passed == total:
+        logger.info("\n🎉 All tests passed!")
+        return 0
+    else:
+        logger.warning(f"\n⚠ {total - passed} test(s) failed")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
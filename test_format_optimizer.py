@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test script for platform format optimization
+This tests the remux/re-encode decision without running FFmpeg
+"""
+import os
+import sys
+import logging
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PLATFORMS = {
+    'youtube': {'max_duration': 60, 'aspect_ratio': '9:16', 'max_file_size_mb': 100},
+}
+
+def make_optimizer(video_info):
+    """Create a FormatOptimizer whose probe returns video_info"""
+    from core.format_optimizer import FormatOptimizer
+    
+    optimizer = FormatOptimizer({'hardware_encoding': False, 'video_codec': 'libx264'}, PLATFORMS)
+    optimizer._extractor.get_video_info = lambda path: video_info
+    return optimizer
+
+def make_clip(directory):
+    """Create a small placeholder clip file"""
+    clip_path = os.path.join(directory, 'clip.mp4')
+    with open(clip_path, 'wb') as f:
+        f.write(b'\0' * 1024)
+    return clip_path
+
+def test_compliant_source_remuxes():
+    """Test that a source already meeting the requirements is stream-copied"""
+    logger.info("Testing remux of a compliant source...")
+    
+    try:
+        from core.format_optimizer import _is_remux
+        
+        info = {'width': 1080, 'height': 1920, 'duration': 30, 'codec': 'h264', 'audio_codec': 'aac'}
+        with tempfile.TemporaryDirectory() as tmp:
+            input_args, output_args, output_path, _ = make_optimizer(info)._build_optimize_args(
+                make_clip(tmp), 'youtube', tmp
+            )
+        
+        if not _is_remux(output_args) or '-vf' in output_args:
+            logger.error(f"✗ Compliant source is re-encoded: {output_args}")
+            return False
+        if not output_path.endswith('clip_youtube_optimized.mp4'):
+            logger.error(f"✗ Unexpected output path: {output_path}")
+            return False
+        
+        logger.info("✓ Compliant source is remuxed")
+        return True
+    except Exception as e:
+        logger.error(f"✗ Remux test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_non_compliant_sources_reencode():
+    """Test that sources needing changes (or with remux disabled) are re-encoded"""
+    logger.info("\nTesting re-encode cases...")
+    
+    try:
+        from core.format_optimizer import _is_remux
+        
+        compliant = {'width': 1080, 'height': 1920, 'duration': 30, 'codec': 'h264', 'audio_codec': 'aac'}
+        cases = [
+            ("landscape source", dict(compliant, width=1920, height=1080), True),
+            ("HEVC source", dict(compliant, codec='hevc'), True),
+            ("Opus audio", dict(compliant, audio_codec='opus'), True),
+            ("too long", dict(compliant, duration=90), True),
+            ("remux disabled", compliant, False),
+        ]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            clip_path = make_clip(tmp)
+            for name, info, allow_remux in cases:
+                _, output_args, _, _ = make_optimizer(info)._build_optimize_args(
+                    clip_path, 'youtube', tmp, allow_remux=allow_remux
+                )
+                if _is_remux(output_args) or output_args[output_args.index('-c:v') + 1] != 'libx264':
+                    logger.error(f"✗ {name} is not re-encoded: {output_args}")
+                    return False
+                logger.info(f"✓ {name} is re-encoded")
+        
+        return True
+    except Exception as e:
+        logger.error(f"✗ Re-encode test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_av1_crf_follows_quality_crf():
+    """Test that the AV1 CRF is derived from quality_crf"""
+    logger.info("\nTesting AV1 CRF mapping...")
+    
+    try:
+        from core.format_optimizer import _av1_codec_args
+        
+        for quality_crf, expected in ((23, '35'), (18, '30'), (60, '63')):
+            args = _av1_codec_args(quality_crf)
+            if args[args.index('-crf') + 1] != expected:
+                logger.error(f"✗ quality_crf {quality_crf} gave {args}, expected CRF {expected}")
+                return False
+        
+        logger.info("✓ AV1 CRF follows quality_crf")
+        return True
+    except Exception as e:
+        logger.error(f"✗ AV1 CRF test failed: {e}")
+        return False
+
+def main():
+    """Run all tests"""
+    logger.info("=" * 60)
+    logger.info("Format Optimizer Test Suite")
+    logger.info("=" * 60)
+    
+    tests = [
+        ("Compliant Source Remux", test_compliant_source_remuxes),
+        ("Re-encode Cases", test_non_compliant_sources_reencode),
+        ("AV1 CRF", test_av1_crf_follows_quality_crf),
+    ]
+    
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            logger.error(f"Test '{name}' crashed: {e}")
+            results.append((name, False))
+    
+    # Summary
+    logger.info("\n" + "=" * 60)
+    logger.info("Test Summary")
+    logger.info("=" * 60)
+    
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+    
+    for name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        logger.info(f"{status}: {name}")
+    
+    logger.info(f"\nTotal: {passed}/{total} tests passed")
+    logger.info("=" * 60)
+    
+    if passed == total:
+        logger.info("\n🎉 All tests passed!")
+        return 0
+    else:
+        logger.warning(f"\n⚠ {total - passed} test(s) failed")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for metadata generation helpers
+This tests hashtag merging without calling the AI API
+"""
+import os
+import sys
+import logging
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def test_merge_hashtags_dedup():
+    """Test that merged hashtags are de-duplicated case-insensitively in order"""
+    logger.info("Testing hashtag merging...")
+    
+    try:
+        from core.metadata_generator import MetadataGenerator
+        
+        prompts = {
+            'hashtag_strategy': {
+                'category_tags': {'comedy': ['#Funny', '#comedy']},
+                'consistent_core_tags': ['#viral', '#FYP'],
+            }
+        }
+        generator = MetadataGenerator({'default_hashtags': ['#fyp', '#Viral']}, prompts, None)
+        
+        merged = generator._merge_hashtags(['#funny', '#clips', '#VIRAL'], 'comedy')
+        expected = ['#fyp', '#Viral', '#funny', '#clips', '#comedy']
+        if merged != expected:
+            logger.error(f"✗ Merged hashtags {merged}, expected {expected}")
+            return False
+        logger.info("✓ Duplicates dropped, first spelling and order kept")
+        
+        merged = generator._merge_hashtags([], 'unknown')
+        if merged != ['#fyp', '#Viral']:
+            logger.error(f"✗ Unknown category merged to {merged}")
+            return False
+        logger.info("✓ Unknown category adds no tags")
+        
+        return True
+    except Exception as e:
+        logger.error(f"✗ Hashtag merging test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def main():
+    """Run all tests"""
+    logger.info("=" * 60)
+    logger.info("Metadata Generator Test Suite")
+    logger.info("=" * 60)
+    
+    tests = [
+        ("Hashtag Merging", test_merge_hashtags_dedup),
+    ]
+    
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            logger.error(f"Test '{name}' crashed: {e}")
+            results.append((name, False))
+    
+    # Summary
+    logger.info("\n" + "=" * 60)
+    logger.info("Test Summary")
+    logger.info("=" * 60)
+    
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+    
+    for name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        logger.info(f"{status}: {name}")
+    
+    logger.info(f"\nTotal: {passed}/{total} tests passed")
+    logger.info("=" * 60)
+    
+    if passed == total:
+        logger.info("\n🎉 All tests passed!")
+        return 0
+    else:
+        logger.warning(f"\n⚠ {total - passed} test(s) failed")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script for upload state storage
+This tests the SQLite store and the import of the earlier JSON state files
+"""
+import os
+import sys
+import json
+import logging
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def test_json_state_import():
+    """Test that existing JSON history and queue are imported into SQLite once"""
+    logger.info("Testing JSON state import...")
+    
+    try:
+        from utils.state_manager import StateManager
+        
+        with tempfile.TemporaryDirectory() as state_dir:
+            with open(os.path.join(state_dir, 'upload_history.json'), 'w') as f:
+                json.dump({'uploads': [
+                    {'clip_path': 'a.mp4', 'platform': 'youtube', 'status': 'success',
+                     'upload_time': '2024-01-01T10:00:00'},
+                    {'clip_path': 'b.mp4', 'platform': 'youtube', 'status': 'success',
+                     'upload_time': '2024-01-02T10:00:00'},
+                    {'clip_path': 'c.mp4', 'platform': 'tiktok', 'status': 'failed',
+                     'upload_time': '2024-01-03T10:00:00'},
+                ]}, f)
+            with open(os.path.join(state_dir, 'upload_queue.json'), 'w') as f:
+                json.dump({'queue': [
+                    {'clip_path': 'd.mp4', 'platform': 'youtube', 'priority': 0,
+                     'scheduled_time': '2024-01-05T10:00:00'},
+                    {'clip_path': 'e.mp4', 'platform': 'instagram', 'priority': 5,
+                     'scheduled_time': '2024-01-06T10:00:00'},
+                ]}, f)
+            
+            state = StateManager(state_dir)
+            
+            history = state.get_history()
+            if [record['clip_path'] for record in history] != ['c.mp4', 'b.mp4', 'a.mp4']:
+                logger.error(f"✗ Imported history is wrong or unsorted: {history}")
+                return False
+            logger.info("✓ History imported, most recent first")
+            
+            if state.get_last_upload_time('youtube') != '2024-01-02T10:00:00':
+                logger.error(f"✗ Last youtube upload is {state.get_last_upload_time('youtube')}")
+                return False
+            logger.info("✓ Last successful upload found per platform")
+            
+            queue = state.get_queue()
+            if [task['clip_path'] for task in queue] != ['e.mp4', 'd.mp4']:
+                logger.error(f"✗ Imported queue is wrong or unsorted: {queue}")
+                return False
+            logger.info("✓ Queue imported, highest priority first")
+            
+            # The database now exists, so a second manager must not import again
+            state._conn.close()
+            state = StateManager(state_dir)
+            if len(state.get_history()) != 3 or len(state.get_queue()) != 2:
+                logger.error("✗ JSON state imported a second time")
+                return False
+            logger.info("✓ JSON state imported only once")
+            state._conn.close()
+        
+        return True
+    except Exception as e:
+        logger.error(f"✗ JSON import test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_queue_updates():
+    """Test updating and removing queued tasks"""
+    logger.info("\nTesting queue updates...")
+    
+    try:
+        from utils.state_manager import StateManager
+        
+        with tempfile.TemporaryDirectory() as state_dir:
+            state = StateManager(state_dir)
+            state.add_to_queue({'clip_path': 'a.mp4', 'platform': 'youtube'})
+            state.add_to_queue({'clip_path': 'b.mp4', 'platform': 'youtube'})
+            
+            state.update_queue_task('b.mp4', 'youtube', {'priority': 10, 'attempts': 1})
+            queue = state.get_queue('youtube')
+            if queue[0]['clip_path'] != 'b.mp4' or queue[0]['attempts'] != 1:
+                logger.error(f"✗ Updated task not reordered or not saved: {queue}")
+                return False
+            logger.info("✓ Updated task saved and reordered")
+            
+            state.remove_from_queue('a.mp4', 'youtube')
+            if [task['clip_path'] for task in state.get_queue()] != ['b.mp4']:
+                logger.error(f"✗ Task not removed: {state.get_queue()}")
+                return False
+            logger.info("✓ Task removed")
+            state._conn.close()
+        
+        return True
+    except Exception as e:
+        logger.error(f"✗ Queue update test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def main():
+    """Run all tests"""
+    logger.info("=" * 60)
+    logger.info("State Manager Test Suite")
+    logger.info("=" * 60)
+    
+    tests = [
+        ("JSON State Import", test_json_state_import),
+        ("Queue Updates", test_queue_updates),
+    ]
+    
+    results = []
+    for name, test_func in tests:
+        try:
+            result = test_func()
+            results.append((name, result))
+        except Exception as e:
+            logger.error(f"Test '{name}' crashed: {e}")
+            results.append((name, False))
+    
+    # Summary
+    logger.info("\n" + "=" * 60)
+    logger.info("Test Summary")
+    logger.info("=" * 60)
+    
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+    
+    for name, result in results:
+        status = "✓ PASS" if result else "✗ FAIL"
+        logger.info(f"{status}: {name}")
+    
+    logger.info(f"\nTotal: {passed}/{total} tests passed")
+    logger.info("=" * 60)
+    
+    if passed == total:
+        logger.info("\n🎉 All tests passed!")
+        return 0
+    else:
+        logger.warning(f"\n⚠ {total - passed} test(s) failed")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -85,10 +85,9 @@ def test_methods_exist():
         
         required_methods = [
             '_check_ffmpeg',
-            '_extract_audio',
+            '_extract_audio_and_frames',
             '_load_whisper_model',
             '_transcribe_audio',
-            '_extract_frames',
             'analyze_video'
         ]
         
@@ -145,6 +144,41 @@ def test_error_handling():
         traceback.print_exc()
         return False
 
+def test_parse_llm_json():
+    """Test that model JSON with common defects is still parsed"""
+    logger.info("\nTesting lenient JSON parsing...")
+    
+    try:
+        from core.video_analyzer import _parse_llm_json
+        
+        cases = [
+            ('{"segments": [{"viral_score": 80}]}', {'segments': [{'viral_score': 80}]}),
+            ('Here you go:\n{"segments": [],}\nHope this helps', {'segments': []}),
+            ('{"segments": [{"text": "line one\nline two",},]}', {'segments': [{'text': 'line one\nline two'}]}),
+            ('[{"video": 1,}]', [{'video': 1}]),
+        ]
+        
+        for text, expected in cases:
+            if _parse_llm_json(text) != expected:
+                logger.error(f"✗ Parsed {text!r} as {_parse_llm_json(text)!r}")
+                return False
+        logger.info("✓ Surrounding prose, trailing commas and raw newlines tolerated")
+        
+        try:
+            _parse_llm_json('no json here')
+        except ValueError:
+            logger.info("✓ Unparseable text raises ValueError")
+        else:
+            logger.error("✗ Unparseable text did not raise ValueError")
+            return False
+        
+        return True
+    except Exception as e:
+        logger.error(f"✗ JSON parsing test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
 def main():
     """Run all tests"""
     logger.info("=" * 60)
@@ -156,6 +190,7 @@ def main():
         ("VideoAnalyzer Initialization", test_video_analyzer_initialization),
         ("Method Existence", test_methods_exist),
         ("Error Handling", test_error_handling),
+        ("Lenient JSON Parsing", test_parse_llm_json),
     ]
     
     results = []